@@ -2,11 +2,32 @@ from unittest import result
 
 from fastapi import FastAPI, UploadFile, File, HTTPException
 from pydantic import BaseModel
-from service import predict_health_status
-from report_reader import extract_values_from_report
+from service import predict_health_status, predict_health_status_batch, FEATURES
+from report_reader import extract_report, get_report_cache
+from report_cache import content_hash
+from biomarker_extractor import fill_missing
+from ocr_pool import OCRPool, PoolSaturated
+from concurrent.futures.process import BrokenProcessPool
+import asyncio
+import io
+import pandas as pd
 
 app = FastAPI(title="Health AI API")
 
+# OCR runs in worker processes so reports never block /predict on the event loop
+ocr_pool = OCRPool()
+
+
+# Opened here so the first report does not create the SQLite table on the event loop
+@app.on_event("startup")
+def open_report_cache():
+    get_report_cache()
+
+
+@app.on_event("shutdown")
+def shutdown_ocr_pool():
+    ocr_pool.shutdown()
+
 class PatientData(BaseModel):
     Blood_glucose: float
     HbA1C: float
@@ -29,6 +50,41 @@ def predict(data: PatientData):
     result = predict_health_status(data.model_dump())
     return result
 
+# ---------- Batch input ----------
+@app.post("/predict/batch")
+def predict_batch(records: list[PatientData]):
+    return predict_health_status_batch([record.model_dump() for record in records])
+
+# CSV or Arrow (Feather) file with one column per PatientData field
+@app.post("/predict/batch/upload")
+def predict_batch_upload(file: UploadFile = File(...)):
+    file_bytes = file.file.read()
+    name = (file.filename or "").lower()
+
+    try:
+        if name.endswith((".arrow", ".feather")) or file.content_type == "application/vnd.apache.arrow.file":
+            df = pd.read_feather(io.BytesIO(file_bytes))
+        elif name.endswith(".csv") or file.content_type == "text/csv":
+            df = pd.read_csv(io.BytesIO(file_bytes))
+        else:
+            raise HTTPException(status_code=400, detail="Invalid file type. Please upload a CSV or Arrow file.")
+
+    except ImportError:
+        raise HTTPException(status_code=415, detail="Arrow uploads need pyarrow installed on the server.")
+
+    except (ValueError, pd.errors.ParserError) as e:
+        raise HTTPException(status_code=400, detail=f"Could not read file: {str(e)}")
+
+    missing = [column for column in FEATURES if column not in df.columns]
+    if missing:
+        raise HTTPException(status_code=400, detail=f"Missing columns: {missing}")
+
+    values = df[FEATURES].apply(pd.to_numeric, errors="coerce")
+    if values.isna().any().any():
+        raise HTTPException(status_code=400, detail="All biomarker columns must be numeric and non-empty.")
+
+    return predict_health_status_batch(values.astype(float))
+
 # ---------- Report upload ----------
 @app.post("/predict-from-report")
 async def predict_from_report(file: UploadFile = File(...)):
@@ -36,14 +92,47 @@ async def predict_from_report(file: UploadFile = File(...)):
     if file.content_type not in ["application/pdf", "image/jpeg", "image/png"]:
         raise HTTPException(status_code=400, detail="Invalid file type. Please upload a PDF or Image.")
 
+    # 2. Extract values: cached by content hash, otherwise in the OCR pool
+    file_bytes = await file.read()
+    key = content_hash(file_bytes)
+    report_cache = get_report_cache()
+
     try:
-        # 2. Extract values
-        # Make sure your extract function can handle the UploadFile object
-        values = extract_values_from_report(file) 
-        
-        # 3. Predict
-        result = predict_health_status(values)
-        return {"extracted_values": values, "prediction": result}
+        report = await asyncio.to_thread(report_cache.get, key)
+        if report is None:
+            report = await ocr_pool.run(extract_report, file_bytes, file.filename)
+            await asyncio.to_thread(report_cache.put, key, report["text"], report["extraction"])
+        extraction = report["extraction"]
+
+    except PoolSaturated:
+        raise HTTPException(
+            status_code=429,
+            detail="Too many reports are being processed. Please retry shortly.",
+            headers={"Retry-After": "5"},
+        )
+
+    except asyncio.TimeoutError:
+        raise HTTPException(status_code=504, detail="Report processing timed out.")
+
+    except BrokenProcessPool:
+        raise HTTPException(
+            status_code=503,
+            detail="Report processing is restarting. Please retry shortly.",
+            headers={"Retry-After": "5"},
+        )
+
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error processing report: {str(e)}")
+
+    try:
+        # 3. Predict (fields missing from the report are scored as 0)
+        result = predict_health_status(fill_missing(extraction["values"]))
+        return {
+            "extracted_values": extraction["values"],
+            "confidence": extraction["confidence"],
+            "missing_fields": extraction["missing"],
+            "prediction": result,
+        }
         
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error processing report: {str(e)}")
\ No newline at end of file
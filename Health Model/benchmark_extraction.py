@@ -0,0 +1,104 @@
+import random
+import re
+import time
+from biomarker_extractor import extract_biomarkers
+
+# Synthetic multi-page lab reports: filler pages of other panels (which
+# mention the biomarker names without usable values) around the real results.
+PAGES = 12
+LINES_PER_PAGE = 45
+REPORTS = 50
+SEED = 7
+
+# The nine lazy patterns the report reader used before extract_biomarkers
+LEGACY_PATTERNS = {
+    "Blood_glucose": r"glucose.*?(\d+\.?\d*)",
+    "HbA1C": r"hba1c.*?(\d+\.?\d*)",
+    "Systolic_BP": r"systolic.*?(\d+\.?\d*)",
+    "Diastolic_BP": r"diastolic.*?(\d+\.?\d*)",
+    "LDL": r"ldl.*?(\d+\.?\d*)",
+    "HDL": r"hdl.*?(\d+\.?\d*)",
+    "Triglycerides": r"triglycerides.*?(\d+\.?\d*)",
+    "Haemoglobin": r"haemoglobin.*?(\d+\.?\d*)",
+    "MCV": r"mcv.*?(\d+\.?\d*)",
+}
+
+FILLER = [
+    "Sodium {a} mmol/L (135 - 145)",
+    "Potassium {b} mmol/L",
+    "Creatinine {b} mg/dL",
+    "Note: glucose, haemoglobin and lipid tests were requested by the referring physician",
+    "Interpretation of LDL, HDL and triglycerides depends on fasting status",
+    "Method: enzymatic colorimetric assay; systolic and diastolic readings taken seated",
+    "Platelet count {a} x10^3/uL",
+    "WBC {b} x10^3/uL",
+]
+
+RESULTS = [
+    "Fasting Glucose: {glucose} mg/dL (70 - 100)",
+    "HbA1c {hba1c} %",
+    "Systolic {sbp} mmHg",
+    "Diastolic {dbp} mmHg",
+    "LDL Cholesterol {ldl} mg/dL",
+    "HDL Cholesterol {hdl} mg/dL",
+    "Triglycerides {tg} mg/dL",
+    "Haemoglobin {hb} g/dL",
+    "MCV {mcv} fL",
+]
+
+
+def legacy_extract(text):
+    values = {}
+    for field, pattern in LEGACY_PATTERNS.items():
+        match = re.search(pattern, text, re.IGNORECASE)
+        values[field] = float(match.group(1)) if match else 0
+    return values
+
+
+def make_report(rng, results=RESULTS):
+    pages = []
+    results_page = rng.randrange(PAGES)
+
+    for page in range(PAGES):
+        lines = [f"CITY LAB - Page {page + 1} of {PAGES}"]
+        for _ in range(LINES_PER_PAGE):
+            lines.append(rng.choice(FILLER).format(a=rng.randint(100, 400), b=round(rng.uniform(1, 9), 1)))
+
+        if page == results_page:
+            lines += [line.format(
+                glucose=rng.randint(70, 250), hba1c=round(rng.uniform(4.5, 11), 1),
+                sbp=rng.randint(100, 180), dbp=rng.randint(60, 110), ldl=rng.randint(60, 220),
+                hdl=rng.randint(25, 80), tg=rng.randint(60, 400), hb=round(rng.uniform(7, 17), 1),
+                mcv=rng.randint(65, 110),
+            ) for line in results]
+
+        pages.append("\n".join(lines) + "\n\f")
+
+    return "".join(pages)
+
+
+def timed(name, extract, reports):
+    start = time.perf_counter()
+    results = [extract(text) for text in reports]
+    elapsed = time.perf_counter() - start
+    print(f"{name:<22} {elapsed / len(reports) * 1000:.3f} ms/report")
+    return results
+
+
+def run(title, reports):
+    print(f"{title}: {len(reports)} reports, {PAGES} pages each, ~{sum(map(len, reports)) // len(reports)} chars")
+
+    legacy = timed("nine regex scans", legacy_extract, reports)
+    single = timed("single-pass extractor", extract_biomarkers, reports)
+
+    # Missing fields are None in the new extractor and 0 in the legacy one
+    agree = sum(old == {k: v or 0 for k, v in new["values"].items()} for old, new in zip(legacy, single))
+    print(f"values agree on {agree}/{len(reports)} reports\n")
+
+
+if __name__ == "__main__":
+    rng = random.Random(SEED)
+
+    run("Complete reports", [make_report(rng) for _ in range(REPORTS)])
+    # No MCV/HbA1c: every scan for those runs to the end of the text
+    run("Reports missing two markers", [make_report(rng, RESULTS[:1] + RESULTS[2:-1]) for _ in range(REPORTS)])
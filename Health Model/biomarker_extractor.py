@@ -0,0 +1,205 @@
+import re
+
+BIOMARKER_FIELDS = (
+    "Blood_glucose", "HbA1C", "Systolic_BP", "Diastolic_BP",
+    "LDL", "HDL", "Triglycerides", "Haemoglobin", "MCV",
+)
+
+# Names as they appear on lab reports. An alias may stand for several fields
+# ("BP 130/85"); their values are taken from the following numbers in order.
+BIOMARKER_ALIASES = {
+    "glucose": ("Blood_glucose",),
+    "blood glucose": ("Blood_glucose",),
+    "fasting glucose": ("Blood_glucose",),
+    "fasting blood glucose": ("Blood_glucose",),
+    "fasting blood sugar": ("Blood_glucose",),
+    "blood sugar": ("Blood_glucose",),
+    "fbs": ("Blood_glucose",),
+    "hba1c": ("HbA1C",),
+    "hb a1c": ("HbA1C",),
+    "a1c": ("HbA1C",),
+    "glycated haemoglobin": ("HbA1C",),
+    "glycated hemoglobin": ("HbA1C",),
+    "glycosylated haemoglobin": ("HbA1C",),
+    "glycosylated hemoglobin": ("HbA1C",),
+    "haemoglobin a1c": ("HbA1C",),
+    "hemoglobin a1c": ("HbA1C",),
+    "systolic": ("Systolic_BP",),
+    "sbp": ("Systolic_BP",),
+    "diastolic": ("Diastolic_BP",),
+    "dbp": ("Diastolic_BP",),
+    "blood pressure": ("Systolic_BP", "Diastolic_BP"),
+    "bp": ("Systolic_BP", "Diastolic_BP"),
+    "ldl": ("LDL",),
+    "ldl-c": ("LDL",),
+    "ldl cholesterol": ("LDL",),
+    "hdl": ("HDL",),
+    "hdl-c": ("HDL",),
+    "hdl cholesterol": ("HDL",),
+    "triglycerides": ("Triglycerides",),
+    "triglyceride": ("Triglycerides",),
+    "tg": ("Triglycerides",),
+    "haemoglobin": ("Haemoglobin",),
+    "hemoglobin": ("Haemoglobin",),
+    "hb": ("Haemoglobin",),
+    "hgb": ("Haemoglobin",),
+    "mcv": ("MCV",),
+    "mean corpuscular volume": ("MCV",),
+}
+
+# Units a value is expected in, and values a report could plausibly carry
+BIOMARKER_UNITS = {
+    "Blood_glucose": ("mg/dl",),
+    "HbA1C": ("%",),
+    "Systolic_BP": ("mmhg",),
+    "Diastolic_BP": ("mmhg",),
+    "LDL": ("mg/dl",),
+    "HDL": ("mg/dl",),
+    "Triglycerides": ("mg/dl",),
+    "Haemoglobin": ("g/dl",),
+    "MCV": ("fl",),
+}
+
+PLAUSIBLE_RANGES = {
+    "Blood_glucose": (20, 800),
+    "HbA1C": (3, 20),
+    "Systolic_BP": (60, 260),
+    "Diastolic_BP": (30, 160),
+    "LDL": (10, 500),
+    "HDL": (5, 200),
+    "Triglycerides": (20, 3000),
+    "Haemoglobin": (2, 25),
+    "MCV": (40, 150),
+}
+
+# Confidence for a value read right after its name, in its usual unit and
+# range; each shortfall costs a fixed amount
+BASE_CONFIDENCE = 1.0
+NO_UNIT_PENALTY = 0.1
+WRONG_UNIT_PENALTY = 0.3
+OUT_OF_RANGE_PENALTY = 0.5
+SHARED_NAME_PENALTY = 0.1 # Value read from a combined name like "BP 130/85"
+
+
+# Aliases compiled as a character trie ("g(?:lucose|lyc...)"), so a position
+# that cannot start a name is rejected after one character. Optional endings
+# are greedy: "haemoglobin a1c" wins over "haemoglobin".
+def _trie_pattern(aliases):
+    tree = {}
+    for alias in aliases:
+        node = tree
+        for char in re.sub(r"[\s\-]+", " ", alias):
+            node = node.setdefault(char, {})
+        node[""] = {}
+
+    def emit(node):
+        branches = [
+            (r"[ \t\-]*" if char == " " else re.escape(char)) + emit(child)
+            for char, child in sorted(node.items()) if char
+        ]
+        if not branches:
+            return ""
+        body = branches[0] if len(branches) == 1 else "(?:" + "|".join(branches) + ")"
+        return "(?:" + body + ")?" if "" in node else body
+
+    return emit(tree)
+
+
+UNIT_PATTERN = r"mg/dl|mmol/l|mmhg|g/dl|g/l|fl|%"
+
+NAME_PATTERN = r"(?<![a-z0-9])" + _trie_pattern(BIOMARKER_ALIASES) + r"(?![a-z0-9])"
+
+DIGIT_REGEX = re.compile(r"\d")
+
+# All three run on lower-cased text; case-insensitive matching is several times slower
+NAME_REGEX = re.compile(NAME_PATTERN)
+
+# Names and numbers (with an optional unit) within one line
+TOKEN_REGEX = re.compile(
+    r"(?P<name>" + NAME_PATTERN + r")"
+    r"|(?P<number>(?<![\w.])\d+(?:\.\d+)?)(?:[ \t]*(?P<unit>" + UNIT_PATTERN + r")(?![a-z]))?"
+)
+
+# Separators inside a name are optional ("HbA1c" / "Hb A1c", "LDL-C" / "LDLC")
+ALIAS_LOOKUP = {re.sub(r"[\s\-]+", "", alias): fields for alias, fields in BIOMARKER_ALIASES.items()}
+
+
+def _fields_for(name):
+    fields = ALIAS_LOOKUP.get(name)
+    return fields if fields is not None else ALIAS_LOOKUP[re.sub(r"[\s\-]+", "", name)]
+
+
+def _confidence(field, value, unit, shared):
+    confidence = BASE_CONFIDENCE
+
+    if unit is None:
+        confidence -= NO_UNIT_PENALTY
+    elif unit not in BIOMARKER_UNITS[field]:
+        confidence -= WRONG_UNIT_PENALTY
+
+    low, high = PLAUSIBLE_RANGES[field]
+    if not low <= value <= high:
+        confidence -= OUT_OF_RANGE_PENALTY
+
+    if shared:
+        confidence -= SHARED_NAME_PENALTY
+
+    return round(max(confidence, 0.0), 2)
+
+
+# Single pass over OCR text. Each field takes the first number that follows
+# one of its names on the same line; names waiting on a line are served in
+# the order they appeared. Only lines that mention a biomarker are tokenized.
+# Missing fields are None with confidence 0.
+def extract_biomarkers(text):
+    text = text.lower()
+    values = dict.fromkeys(BIOMARKER_FIELDS)
+    confidence = dict.fromkeys(BIOMARKER_FIELDS, 0.0)
+    remaining = len(BIOMARKER_FIELDS)
+    line_end = -1
+
+    for name in NAME_REGEX.finditer(text):
+        if name.start() < line_end:
+            continue # Line already read
+
+        line_end = text.find("\n", name.start())
+        if line_end == -1:
+            line_end = len(text)
+
+        # Mentions without any number ("... glucose and lipid tests were requested")
+        if not DIGIT_REGEX.search(text, name.end(), line_end):
+            continue
+
+        pending = []
+        for token in TOKEN_REGEX.finditer(text, name.start(), line_end):
+            if token.group("name"):
+                fields = _fields_for(token.group("name"))
+                for field in fields:
+                    if values[field] is None and all(field != waiting for waiting, _ in pending):
+                        pending.append((field, len(fields) > 1))
+
+            elif pending:
+                field, shared = pending.pop(0)
+                value = float(token.group("number"))
+
+                values[field] = value
+                confidence[field] = _confidence(field, value, token.group("unit"), shared)
+                remaining -= 1
+
+        if remaining == 0:
+            break
+
+    return {
+        "values": values,
+        "confidence": confidence,
+        "missing": [field for field in BIOMARKER_FIELDS if values[field] is None],
+    }
+
+
+def has_all_biomarkers(text):
+    return not extract_biomarkers(text)["missing"]
+
+
+# Model input: missing fields read as 0, as the report reader always did
+def fill_missing(values, default=0.0):
+    return {field: default if values.get(field) is None else values[field] for field in BIOMARKER_FIELDS}
@@ -0,0 +1,102 @@
+import asyncio
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+# OCR worker processes, reports allowed to wait for a worker, and the time a
+# request may take end to end (seconds)
+OCR_MAX_WORKERS = int(os.environ.get("OCR_MAX_WORKERS", "2"))
+OCR_QUEUE_DEPTH = int(os.environ.get("OCR_QUEUE_DEPTH", "8"))
+OCR_TIMEOUT_SECONDS = float(os.environ.get("OCR_TIMEOUT_SECONDS", "60"))
+
+
+class PoolSaturated(Exception):
+    pass
+
+
+# Bounded process pool for blocking OCR work. At most max_workers jobs run and
+# queue_depth more wait; anything beyond that is rejected immediately.
+class OCRPool:
+
+    def __init__(self, max_workers=OCR_MAX_WORKERS, queue_depth=OCR_QUEUE_DEPTH, timeout=OCR_TIMEOUT_SECONDS):
+        self.max_workers = max_workers
+        self.queue_depth = queue_depth
+        self.timeout = timeout
+        self._executor = None
+        self._pending = 0
+        self._lock = threading.Lock()
+
+    @property
+    def pending(self):
+        return self._pending
+
+    def _acquire(self):
+        with self._lock:
+            if self._pending >= self.max_workers + self.queue_depth:
+                raise PoolSaturated()
+            self._pending += 1
+
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(max_workers=self.max_workers)
+            return self._executor
+
+    def _release(self, _future):
+        with self._lock:
+            self._pending -= 1
+
+    # Drops a pool whose worker died (e.g. OOM) so the next _acquire builds a
+    # fresh one. Another request may already have replaced it.
+    def _discard(self, executor):
+        with self._lock:
+            if self._executor is not executor:
+                return
+            self._executor = None
+        executor.shutdown(wait=False, cancel_futures=True)
+
+    def _submit(self, fn, args):
+        executor = self._acquire()
+        try:
+            future = executor.submit(fn, *args)
+        except BaseException as e:
+            self._release(None)
+            if isinstance(e, BrokenProcessPool):
+                # The pool broke before this job was submitted
+                self._discard(executor)
+            raise
+
+        # The slot is freed when the job really ends, not when the caller gives up
+        future.add_done_callback(self._release)
+        return executor, future
+
+    # Runs fn(*args) in a worker process without blocking the event loop.
+    # Raises PoolSaturated when full, asyncio.TimeoutError after `timeout` and
+    # BrokenProcessPool if a fresh pool breaks as well.
+    async def run(self, fn, *args):
+        for attempt in range(2):
+            try:
+                executor, future = self._submit(fn, args)
+            except BrokenProcessPool:
+                if attempt == 1:
+                    raise
+                continue
+
+            try:
+                return await asyncio.wait_for(asyncio.wrap_future(future), self.timeout)
+
+            except BrokenProcessPool:
+                self._discard(executor)
+                if attempt == 1:
+                    raise
+
+            except asyncio.TimeoutError:
+                # Drops the job if it never started. A running job keeps its
+                # worker and its slot until it ends, so backpressure stays exact.
+                future.cancel()
+                raise
+
+    def shutdown(self):
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,142 @@
+import contextlib
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+REPORT_CACHE_PATH = os.environ.get("REPORT_CACHE_PATH", "report_cache.sqlite3")
+REPORT_CACHE_TTL_SECONDS = float(os.environ.get("REPORT_CACHE_TTL_SECONDS", str(7 * 24 * 3600)))
+
+
+def content_hash(file_bytes):
+    return hashlib.sha256(file_bytes).hexdigest()
+
+
+# Two-tier cache from uploaded report bytes to OCR text and the extraction:
+# an in-memory LRU per process in front of a SQLite file shared by every
+# worker. Entries written under another `version` (extraction patterns) are
+# never returned and are pruned on the next write. SQLite errors after
+# startup (e.g. "database is locked") count as misses and skipped writes.
+class ReportCache:
+
+    def __init__(self, version, path=REPORT_CACHE_PATH, max_memory_entries=256,
+                 max_disk_entries=10000, ttl_seconds=REPORT_CACHE_TTL_SECONDS):
+        self.version = version
+        self.path = path
+        self.max_memory_entries = max_memory_entries
+        self.max_disk_entries = max_disk_entries
+        self.ttl_seconds = ttl_seconds
+
+        self.hits = 0
+        self.misses = 0
+        self.errors = 0
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+
+        with self._connect() as db:
+            db.execute(
+                "CREATE TABLE IF NOT EXISTS reports ("
+                " hash TEXT NOT NULL, version TEXT NOT NULL, text TEXT NOT NULL, report_values TEXT NOT NULL,"
+                " created REAL NOT NULL, last_used REAL NOT NULL, PRIMARY KEY (hash, version))"
+            )
+
+    # Commits (or rolls back) on exit and always closes the connection;
+    # sqlite3's own context manager only does the former
+    @contextlib.contextmanager
+    def _connect(self):
+        with contextlib.closing(sqlite3.connect(self.path, timeout=10)) as db:
+            with db:
+                yield db
+
+    # {"text", "extraction"} for previously seen bytes, or None
+    def get(self, key):
+        now = time.time()
+
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None and now - entry["created"] <= self.ttl_seconds:
+                self._memory.move_to_end(key)
+                self.hits += 1
+                return self._copy(entry)
+            self._memory.pop(key, None)
+
+        try:
+            with self._connect() as db:
+                row = db.execute(
+                    "SELECT text, report_values, created FROM reports WHERE hash = ? AND version = ? AND created >= ?",
+                    (key, self.version, now - self.ttl_seconds),
+                ).fetchone()
+                if row is not None:
+                    db.execute("UPDATE reports SET last_used = ? WHERE hash = ? AND version = ?", (now, key, self.version))
+        except sqlite3.Error:
+            row = None
+            with self._lock:
+                self.errors += 1
+
+        with self._lock:
+            if row is None:
+                self.misses += 1
+                return None
+
+            self.hits += 1
+            entry = {"text": row[0], "extraction": row[1], "created": row[2]}
+            self._remember(key, entry)
+            return self._copy(entry)
+
+    def put(self, key, text, extraction):
+        now = time.time()
+        entry = {"text": text, "extraction": json.dumps(extraction), "created": now}
+
+        with self._lock:
+            self._remember(key, entry)
+
+        # Still served from memory in this process if the disk write fails
+        try:
+            with self._connect() as db:
+                db.execute(
+                    "INSERT OR REPLACE INTO reports VALUES (?, ?, ?, ?, ?, ?)",
+                    (key, self.version, text, entry["extraction"], now, now),
+                )
+                self._prune(db, now)
+        except sqlite3.Error:
+            with self._lock:
+                self.errors += 1
+
+    def clear(self):
+        with self._lock:
+            self._memory.clear()
+            self.hits = 0
+            self.misses = 0
+            self.errors = 0
+
+        with self._connect() as db:
+            db.execute("DELETE FROM reports")
+
+    def info(self):
+        return {"hits": self.hits, "misses": self.misses, "errors": self.errors, "memory_entries": len(self._memory), "version": self.version}
+
+    def _remember(self, key, entry):
+        self._memory[key] = entry
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_memory_entries:
+            self._memory.popitem(last=False)
+
+    def _prune(self, db, now):
+        db.execute(
+            "DELETE FROM reports WHERE version != ? OR created < ?",
+            (self.version, now - self.ttl_seconds),
+        )
+        # Least recently used rows beyond the size limit
+        db.execute(
+            "DELETE FROM reports WHERE rowid IN ("
+            " SELECT rowid FROM reports ORDER BY last_used DESC LIMIT -1 OFFSET ?)",
+            (self.max_disk_entries,),
+        )
+
+    # Entries keep the extraction serialized, so every caller gets its own copy
+    @staticmethod
+    def _copy(entry):
+        return {"text": entry["text"], "extraction": json.loads(entry["extraction"])}
@@ -1,49 +1,91 @@
 import pytesseract
 pytesseract.pytesseract.tesseract_cmd = r"C:/Program Files/Tesseract-OCR/tesseract.exe"
 from PIL import Image
+import hashlib
 import io
-import re
-from pdf2image import convert_from_bytes
+import json
+import os
+from concurrent.futures import ThreadPoolExecutor
+from pdf2image import convert_from_bytes, pdfinfo_from_bytes
+from report_cache import ReportCache
+from biomarker_extractor import (
+    BIOMARKER_ALIASES,
+    BIOMARKER_UNITS,
+    PLAUSIBLE_RANGES,
+    extract_biomarkers,
+    has_all_biomarkers,
+)
+
+POPPLER_PATH = r"C:/Users/senan/Downloads/Release-25.12.0-0/poppler-25.12.0/Library/bin"
+
+# Pages rasterized and OCR'd at once per PDF. pdftoppm and tesseract run as
+# their own processes, so threads are enough to keep several busy.
+PAGE_WORKERS = int(os.environ.get("OCR_PAGE_WORKERS", "2"))
+
+# Bump when OCR or text handling changes; alias, unit and range edits change the key on their own
+READER_VERSION = 2
+EXTRACTION_VERSION = hashlib.sha256(
+    json.dumps(
+        {"reader": READER_VERSION, "aliases": BIOMARKER_ALIASES, "units": BIOMARKER_UNITS, "ranges": PLAUSIBLE_RANGES},
+        sort_keys=True,
+    ).encode()
+).hexdigest()[:16]
+
+_report_cache = None
+
+# Created on first use so OCR worker processes never open the database
+def get_report_cache():
+    global _report_cache
+    if _report_cache is None:
+        _report_cache = ReportCache(EXTRACTION_VERSION)
+    return _report_cache
 
 def extract_text_from_image(file_bytes):
     image = Image.open(io.BytesIO(file_bytes))
     return pytesseract.image_to_string(image)
 
-def extract_text_from_pdf(file_bytes):
-    pages = convert_from_bytes(
+# Rasterizes a single page, so only in-flight pages are held as bitmaps
+def extract_text_from_pdf_page(file_bytes, page_number):
+    page = convert_from_bytes(
         file_bytes,
-        poppler_path=r"C:/Users/senan/Downloads/Release-25.12.0-0/poppler-25.12.0/Library/bin"
-    )
-    
-    import pytesseract
-    text = ""
-    for page in pages:
-        text += pytesseract.image_to_string(page)
-        
-    return text
+        first_page=page_number,
+        last_page=page_number,
+        poppler_path=POPPLER_PATH
+    )[0]
+    return pytesseract.image_to_string(page)
+
+# Page texts in page order, OCR'd `workers` pages at a time
+def iter_pdf_page_text(file_bytes, workers=PAGE_WORKERS):
+    page_count = pdfinfo_from_bytes(file_bytes, poppler_path=POPPLER_PATH)["Pages"]
 
-def find_value(pattern, text):
-    match = re.search(pattern, text, re.IGNORECASE)
-    return float(match.group(1)) if match else 0
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        futures = [executor.submit(extract_text_from_pdf_page, file_bytes, page) for page in range(1, page_count + 1)]
+        try:
+            for future in futures:
+                yield future.result()
+        finally:
+            # Stopped early: skip pages that have not started
+            for future in futures:
+                future.cancel()
 
-def extract_values_from_report(upload_file):
-    file_bytes = upload_file.file.read()
+# With stop_when_complete, pages after the one that completes all nine
+# biomarkers are never OCR'd. Values are unchanged: each pattern keeps its
+# first match, and later pages only append text.
+def extract_text_from_pdf(file_bytes, stop_when_complete=False, workers=PAGE_WORKERS):
+    text = ""
+    for page_text in iter_pdf_page_text(file_bytes, workers):
+        text += page_text
+        if stop_when_complete and has_all_biomarkers(text):
+            break
+
+    return text
 
-    if upload_file.filename.lower().endswith(".pdf"):
-        text = extract_text_from_pdf(file_bytes)
+# OCR text and extract_biomarkers() result, uncached. Top-level so it can run
+# in an OCR worker process; the api caches it with get_report_cache()
+def extract_report(file_bytes, filename):
+    if filename.lower().endswith(".pdf"):
+        text = extract_text_from_pdf(file_bytes, stop_when_complete=True)
     else:
         text = extract_text_from_image(file_bytes)
 
-    values = {
-        "Blood_glucose": find_value(r"glucose.*?(\d+\.?\d*)", text),
-        "HbA1C": find_value(r"hba1c.*?(\d+\.?\d*)", text),
-        "Systolic_BP": find_value(r"systolic.*?(\d+\.?\d*)", text),
-        "Diastolic_BP": find_value(r"diastolic.*?(\d+\.?\d*)", text),
-        "LDL": find_value(r"ldl.*?(\d+\.?\d*)", text),
-        "HDL": find_value(r"hdl.*?(\d+\.?\d*)", text),
-        "Triglycerides": find_value(r"triglycerides.*?(\d+\.?\d*)", text),
-        "Haemoglobin": find_value(r"haemoglobin.*?(\d+\.?\d*)", text),
-        "MCV": find_value(r"mcv.*?(\d+\.?\d*)", text)
-    }
-
-    return values
\ No newline at end of file
+    return {"text": text, "extraction": extract_biomarkers(text)}
@@ -0,0 +1,229 @@
+import operator
+
+import numpy as np
+
+# Clinical rules shared by the API (service.py) and the Streamlit app.
+#
+# Every threshold comparison any rule needs is listed once. A record is
+# evaluated into a bitmask (bit i set = THRESHOLDS[i] holds), and the risk
+# score, indicators and overrides all read that mask.
+THRESHOLDS = [
+    ("Blood_glucose", ">", 140),
+    ("Blood_glucose", ">=", 110),
+    ("HbA1C", ">", 6.5),
+    ("HbA1C", ">=", 6.5),
+    ("Systolic_BP", ">", 140),
+    ("Systolic_BP", ">=", 140),
+    ("Systolic_BP", ">=", 130),
+    ("Diastolic_BP", ">", 90),
+    ("Diastolic_BP", ">=", 90),
+    ("Diastolic_BP", ">=", 80),
+    ("LDL", ">", 160),
+    ("LDL", ">=", 160),
+    ("LDL", ">=", 140),
+    ("HDL", "<", 40),
+    ("Triglycerides", ">", 200),
+    ("Triglycerides", ">=", 200),
+    ("Triglycerides", ">=", 150),
+    ("Haemoglobin", "<", 10),
+    ("MCV", "<", 80),
+    ("MCV", ">", 100),
+]
+
+OPERATORS = {">": operator.gt, ">=": operator.ge, "<": operator.lt}
+
+
+def threshold_name(field, op, value):
+    return f"{field}{op}{value}"
+
+
+BIT = {threshold_name(*threshold): 1 << i for i, threshold in enumerate(THRESHOLDS)}
+
+
+def mask_of(*names):
+    mask = 0
+    for name in names:
+        mask |= BIT[name]
+    return mask
+
+
+# Each met threshold adds its points; the percentage is out of the maximum
+RISK_POINTS = [
+    (mask_of("Blood_glucose>140"), 2),
+    (mask_of("Systolic_BP>140"), 2),
+    (mask_of("LDL>160"), 2),
+    (mask_of("Haemoglobin<10"), 2),
+]
+MAX_RISK_SCORE = sum(points for _, points in RISK_POINTS)
+
+# (indicator, any of these thresholds)
+INDICATORS = [
+    ("High Blood Glucose", mask_of("Blood_glucose>140")),
+    ("Elevated HbA1C", mask_of("HbA1C>6.5")),
+    ("High Systolic BP", mask_of("Systolic_BP>140")),
+    ("High Diastolic BP", mask_of("Diastolic_BP>90")),
+    ("High LDL", mask_of("LDL>160")),
+    ("High Triglycerides", mask_of("Triglycerides>200")),
+    ("Low Haemoglobin", mask_of("Haemoglobin<10")),
+    ("Low HDL", mask_of("HDL<40")),
+    ("Abnormal MCV", mask_of("MCV<80", "MCV>100")),
+]
+NORMAL_INDICATOR = "All biomarkers within normal range"
+
+# Override chain, first match wins. A rule fires when any of its thresholds
+# holds; "only_if" rules then change the result only for that model
+# prediction, and "cap" lowers confidence instead of raising it.
+# "extended" rules are the app's cardiometabolic refinements.
+OVERRIDES = [
+    {"when": mask_of("HbA1C>=6.5"), "condition": "Diabetes", "floor": 0.90},
+    {"when": mask_of("Haemoglobin<10"), "condition": "Anemia", "floor": 0.90},
+    {"when": mask_of("Systolic_BP>=140", "Diastolic_BP>=90"), "condition": "Hypertension", "floor": 0.85},
+    {"when": mask_of("Systolic_BP>=130", "Diastolic_BP>=80"), "only_if": "Hypertension",
+     "condition": "Elevated Cardiometabolic Risk", "cap": 0.65, "extended": True},
+    {"when": mask_of("LDL>=160", "Triglycerides>=200"), "condition": "High Cholesterol", "floor": 0.85},
+]
+
+# Extended: at least two of these risk flags give a metabolic pattern,
+# whatever the override chain decided
+METABOLIC_FLAGS = [
+    mask_of("Blood_glucose>=110"),
+    mask_of("Systolic_BP>=130"),
+    mask_of("LDL>=140", "Triglycerides>=150"),
+]
+METABOLIC_MIN_FLAGS = 2
+METABOLIC_CONDITION = "Metabolic Risk Pattern"
+METABOLIC_FLOOR = 0.70
+
+
+def active_overrides(extended):
+    return [rule for rule in OVERRIDES if extended or not rule.get("extended")]
+
+
+# ---------- Single record ----------
+def threshold_bits(record):
+    bits = 0
+    for i, (field, op, value) in enumerate(THRESHOLDS):
+        if OPERATORS[op](record[field], value):
+            bits |= 1 << i
+    return bits
+
+
+def risk_score(bits):
+    return sum(points for mask, points in RISK_POINTS if bits & mask)
+
+
+def risk_category(score):
+    if score >= 4:
+        return "High Risk"
+    if score >= 2:
+        return "Moderate Risk"
+    return "Low Risk"
+
+
+def risk_percentage(score):
+    return int((score / MAX_RISK_SCORE) * 100)
+
+
+def clinical_indicators(bits):
+    indicators = [name for name, mask in INDICATORS if bits & mask]
+    return indicators or [NORMAL_INDICATOR]
+
+
+def apply_overrides(bits, condition, confidence, extended=False):
+    for rule in active_overrides(extended):
+        if not bits & rule["when"]:
+            continue
+
+        if rule.get("only_if", condition) == condition:
+            condition = rule["condition"]
+            if "floor" in rule:
+                confidence = max(confidence, rule["floor"])
+            else:
+                confidence = min(confidence, rule["cap"])
+        break
+
+    if extended and sum(1 for mask in METABOLIC_FLAGS if bits & mask) >= METABOLIC_MIN_FLAGS:
+        condition = METABOLIC_CONDITION
+        confidence = max(confidence, METABOLIC_FLOOR)
+
+    return condition, confidence
+
+
+# Overrides, risk and indicators for one record and its model prediction
+def evaluate(record, condition, confidence, extended=False):
+    bits = threshold_bits(record)
+    score = risk_score(bits)
+    condition, confidence = apply_overrides(bits, condition, confidence, extended)
+
+    return {
+        "predicted_condition": condition,
+        "confidence": confidence,
+        "risk_category": risk_category(score),
+        "risk_percentage": risk_percentage(score),
+        "clinical_indicators": clinical_indicators(bits),
+    }
+
+
+# ---------- Batch ----------
+# `columns` maps each field to an array (a DataFrame works)
+def threshold_bits_batch(columns):
+    bits = None
+    for i, (field, op, value) in enumerate(THRESHOLDS):
+        holds = OPERATORS[op](np.asarray(columns[field]), value).astype(np.int64) << i
+        bits = holds if bits is None else bits | holds
+    return bits
+
+
+def risk_score_batch(bits):
+    score = np.zeros(len(bits), dtype=np.int64)
+    for mask, points in RISK_POINTS:
+        score += np.where(bits & mask, points, 0)
+    return score
+
+
+def apply_overrides_batch(bits, conditions, confidences, extended=False):
+    conditions = np.asarray(conditions, dtype=object).copy()
+    confidences = np.asarray(confidences, dtype=np.float64).copy()
+    undecided = np.ones(len(bits), dtype=bool)
+
+    for rule in active_overrides(extended):
+        fires = undecided & ((bits & rule["when"]) != 0)
+        undecided &= ~fires
+
+        if "only_if" in rule:
+            fires &= conditions == rule["only_if"]
+
+        conditions[fires] = rule["condition"]
+        if "floor" in rule:
+            confidences[fires] = np.maximum(confidences[fires], rule["floor"])
+        else:
+            confidences[fires] = np.minimum(confidences[fires], rule["cap"])
+
+    if extended:
+        flags = sum(((bits & mask) != 0).astype(int) for mask in METABOLIC_FLAGS)
+        metabolic = flags >= METABOLIC_MIN_FLAGS
+        conditions[metabolic] = METABOLIC_CONDITION
+        confidences[metabolic] = np.maximum(confidences[metabolic], METABOLIC_FLOOR)
+
+    return conditions, confidences
+
+
+def evaluate_batch(columns, conditions, confidences, extended=False):
+    bits = threshold_bits_batch(columns)
+    score = risk_score_batch(bits)
+    conditions, confidences = apply_overrides_batch(bits, conditions, confidences, extended)
+
+    results = []
+    for i in range(len(bits)):
+        row_bits = int(bits[i])
+        row_score = int(score[i])
+
+        results.append({
+            "predicted_condition": conditions[i],
+            "confidence": float(confidences[i]),
+            "risk_category": risk_category(row_score),
+            "risk_percentage": risk_percentage(row_score),
+            "clinical_indicators": clinical_indicators(row_bits),
+        })
+
+    return results
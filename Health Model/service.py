@@ -1,106 +1,81 @@
 import joblib
+import numpy as np
 import pandas as pd
+from risk_rules import evaluate, evaluate_batch, threshold_bits, risk_score, risk_category, risk_percentage
 
 # Load model artifacts once at startup
 model = joblib.load("health_model.pkl")
 scaler = joblib.load("scaler.pkl")
 le = joblib.load("label_encoder.pkl")
 
+# Column order the scaler and model were fitted on
+FEATURES = [
+    "Blood_glucose", "HbA1C", "Systolic_BP", "Diastolic_BP",
+    "LDL", "HDL", "Triglycerides", "Haemoglobin", "MCV",
+]
+
+# Single-record fast path: RobustScaler parameters as arrays, the forest's
+# trees, and class ids mapped straight to label names
+SCALER_CENTER = scaler.center_.astype(np.float64)
+SCALER_SCALE = scaler.scale_.astype(np.float64)
+TREES = tuple(model.estimators_)
+CLASS_NAMES = tuple(le.inverse_transform(model.classes_))
+
 
 # ---------- Risk Logic ----------
 def calculate_risk(row):
-    score = 0
-    if row["Blood_glucose"] > 140: 
-        score += 2
-    if row["Systolic_BP"] > 140: 
-        score += 2
-    if row["LDL"] > 160: 
-        score += 2
-    if row["Haemoglobin"] < 10: 
-        score += 2
-
-    if score >= 4: 
-        return "High Risk"
-    if score >= 2: 
-        return "Moderate Risk"
-    return "Low Risk"
+    return risk_category(risk_score(threshold_bits(row)))
 
 
 def calculate_risk_percentage(row):
-    score = 0
-    if row["Blood_glucose"] > 140: 
-        score += 2
-    if row["Systolic_BP"] > 140: 
-        score += 2
-    if row["LDL"] > 160: 
-        score += 2
-    if row["Haemoglobin"] < 10: 
-        score += 2
-    return int((score / 8) * 100)
+    return risk_percentage(risk_score(threshold_bits(row)))
 
 
 # ---------- Prediction ----------
-def predict_health_status(input_data: dict):
+# Same result as scaler.transform + model.predict_proba on a one-row
+# DataFrame: RobustScaler's (x - center) / scale, then the forest's average
+# of tree probabilities summed in estimator order
+def predict_proba_single(input_data: dict):
+    x = np.array([[input_data[feature] for feature in FEATURES]], dtype=np.float64)
+    x -= SCALER_CENTER
+    x /= SCALER_SCALE
+    x = x.astype(np.float32)
 
-    df = pd.DataFrame([input_data])
-    scaled = scaler.transform(df)
+    probs = np.zeros((1, len(CLASS_NAMES)))
+    for tree in TREES:
+        probs += tree.predict_proba(x, check_input=False)
+    probs /= len(TREES)
+
+    return probs[0]
 
-    probs = model.predict_proba(scaled)[0]
+
+def predict_health_status(input_data: dict):
+
+    probs = predict_proba_single(input_data)
     pred_class = probs.argmax()
     confidence = float(probs.max())
 
-    condition = le.inverse_transform([pred_class])[0]
-
-    # ---- Clinical override rules ----
-    if input_data["HbA1C"] >= 6.5:
-        condition = "Diabetes"
-        confidence = max(confidence, 0.90)
-
-    elif input_data["Haemoglobin"] < 10:
-        condition = "Anemia"
-        confidence = max(confidence, 0.90)
-
-    elif input_data["Systolic_BP"] >= 140 or input_data["Diastolic_BP"] >= 90:
-        condition = "Hypertension"
-        confidence = max(confidence, 0.85)
-
-    elif input_data["LDL"] >= 160 or input_data["Triglycerides"] >= 200:
-        condition = "High Cholesterol"
-        confidence = max(confidence, 0.85)
-
-    # ---- Risk ----
-    risk = calculate_risk(input_data)
-    risk_percent = calculate_risk_percentage(input_data)
-
-    # ---- Clinical indicators ----
-    indicators = []
-
-    if input_data["Blood_glucose"] > 140:
-        indicators.append("High Blood Glucose")
-    if input_data["HbA1C"] > 6.5:
-        indicators.append("Elevated HbA1C")
-    if input_data["Systolic_BP"] > 140:
-        indicators.append("High Systolic BP")
-    if input_data["Diastolic_BP"] > 90:
-        indicators.append("High Diastolic BP")
-    if input_data["LDL"] > 160:
-        indicators.append("High LDL")
-    if input_data["Triglycerides"] > 200:
-        indicators.append("High Triglycerides")
-    if input_data["Haemoglobin"] < 10:
-        indicators.append("Low Haemoglobin")
-    if input_data["HDL"] < 40:
-        indicators.append("Low HDL")
-    if input_data["MCV"] < 80 or input_data["MCV"] > 100:
-        indicators.append("Abnormal MCV")
-
-    if not indicators:
-        indicators.append("All biomarkers within normal range")
-
-    return {
-        "predicted_condition": condition,
-        "confidence": confidence,
-        "risk_category": risk,
-        "risk_percentage": risk_percent,
-        "clinical_indicators": indicators
-    }
\ No newline at end of file
+    condition = CLASS_NAMES[pred_class]
+
+    # ---- Clinical overrides, risk and indicators ----
+    return evaluate(input_data, condition, confidence)
+
+
+# ---------- Batch prediction ----------
+# Same rules as predict_health_status, evaluated as column masks over the
+# whole population. `records` is a list of dicts or a DataFrame.
+def predict_health_status_batch(records):
+
+    df = pd.DataFrame(records, columns=FEATURES)
+    if df.empty:
+        return []
+
+    scaled = scaler.transform(df)
+
+    probs = model.predict_proba(scaled)
+    pred_class = probs.argmax(axis=1)
+    confidence = probs.max(axis=1)
+
+    condition = le.classes_[model.classes_[pred_class]]
+
+    return evaluate_batch(df, condition, confidence)
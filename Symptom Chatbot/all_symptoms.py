@@ -1,79 +1,27 @@
 import pandas as pd
-import numpy as np
-from sklearn.preprocessing import LabelEncoder
-from sklearn.model_selection import train_test_split
+from symptom_knowledge import load_knowledge
+from bayesian_engine import build_log_likelihoods
 
-# Load dataset
-df = pd.read_csv("DiseaseAndSymptoms.csv")
+# Load the precompiled knowledge artifact (built by model.py / symptom_knowledge.py)
+knowledge = load_knowledge()
 
-# Build binary symptom matrix
-symptoms = set()
-for col in df.columns[1:]:
-    symptoms.update([s.strip() for s in df[col].dropna().unique()])
+symptoms = knowledge["symptoms"]
+label_classes = knowledge["diseases"]
 
-symptoms = sorted(symptoms)
+# Symptoms the model was trained on, in feature order
+common_symptoms = knowledge["common_symptoms"]
 
-binary_df = pd.DataFrame(0, index=np.arange(len(df)), columns=symptoms)
+# Conditional probabilities P(symptom | disease), as a (diseases x symptoms) matrix
+symptom_prob_matrix = knowledge["disease_symptom_prob"]
 
-for i, row in df.iterrows():
-    for col in df.columns[1:]:
-        symptom = row[col]
-        if pd.notna(symptom):
-            symptom = symptom.strip()
-            binary_df.at[i, symptom] = 1
+# ... and as one Series per disease
+disease_symptom_prob = {
+    disease: pd.Series(symptom_prob_matrix[i], index=symptoms)
+    for i, disease in enumerate(label_classes)
+}
 
-binary_df["Disease"] = df["Disease"]
+# Integer column for each symptom in the likelihood matrices
+symptom_index = {symptom: i for i, symptom in enumerate(symptoms)}
 
-# Conditional probabilities
-disease_groups = binary_df.groupby("Disease")
-disease_symptom_prob = {}
-
-for disease, group in disease_groups:
-    symptom_means = group.drop("Disease", axis=1).mean()
-    disease_symptom_prob[disease] = symptom_means
-
-# Generate synthetic patients (added noise and dropout to prevent overfitting)
-synthetic_rows = []
-samples_per_disease = 400
-noise_rate = 0.08 # Reduced from 0.15 to prevent severe underfitting
-dropout_rate = 0.10 # Reduced from 0.20
-
-for disease, symptom_probs in disease_symptom_prob.items():
-    for _ in range(samples_per_disease):
-
-        patient = []
-
-        for symptom in symptoms:
-            prob = symptom_probs[symptom]
-            value = np.random.rand() < prob
-
-            if np.random.rand() < noise_rate:
-                value = not value
-            
-            # Simulate patient forgetting to mention a symptom
-            if value and np.random.rand() < dropout_rate:
-                value = False
-
-            patient.append(int(value))
-
-        patient.append(disease)
-        synthetic_rows.append(patient)
-
-synthetic_df = pd.DataFrame(synthetic_rows, columns=symptoms + ["Disease"])
-
-# Remove rare symptoms
-symptom_counts = synthetic_df.drop("Disease", axis=1).sum()
-common_symptoms = symptom_counts[symptom_counts > 500].index.tolist()
-
-synthetic_df = synthetic_df[common_symptoms + ["Disease"]]
-
-# Encode labels
-labels = LabelEncoder()
-synthetic_df["label"] = labels.fit_transform(synthetic_df["Disease"])
-
-x = synthetic_df.drop(["Disease", "label"], axis=1)
-y = synthetic_df["label"]
-
-x_train, x_test, y_train, y_test = train_test_split(
-    x, y, test_size=0.2, random_state=42, stratify=y
-)
\ No newline at end of file
+# Smoothed log P(symptom present | disease) / log P(symptom absent | disease)
+log_likelihoods = build_log_likelihoods(symptom_prob_matrix)
@@ -1,11 +1,19 @@
 from fastapi import FastAPI
 from pydantic import BaseModel
+from typing import Literal, Optional
 import joblib as jb
 import numpy as np
-from all_symptoms import common_symptoms, disease_symptom_prob
-from bayesian_engine import bayesian_update
+from all_symptoms import symptoms, common_symptoms, symptom_prob_matrix, label_classes, symptom_index, log_likelihoods
+from symptom_knowledge import check_label_encoder
+from medication_store import medication_store
+from bayesian_engine import bayesian_update_batch, bayesian_update_matrix
 from symptom_mapper import extract_symptoms_from_text
-from clinical_response_engine import generate_clinical_response
+from clinical_response_engine import generate_clinical_response, generate_structured_response
+from session_store import SessionStore
+from clinical_rules import ClinicalRuleEngine, patient_context
+from symptom_model import load_symptom_model
+from lru_cache import LRUCache
+from prediction_cache import prediction_key
 
 from fastapi.middleware.cors import CORSMiddleware
 
@@ -21,11 +29,14 @@ app.add_middleware(
 )
 
 # Loading ML model when server starts
-model = jb.load("disease_prediction_model.pkl")
+model = load_symptom_model("disease_prediction_model.pkl")
 labels = jb.load("label_encoder.pkl")
+check_label_encoder(labels, label_classes)
+medication_store.bind_labels(labels.classes_)
 
 
-from question_selector import select_best_question
+from question_planner import choose_question
+from question_selector import DEFAULT_QUESTION_MODE
 import re
 
 class PatientProfile(BaseModel):
@@ -41,132 +52,293 @@ class ChatRequest(BaseModel):
     new_text: str
     confirmed_symptoms: list[str]
     denied_symptoms: list[str]
+    # Session mode: set `stateful` on the first turn, then send back the returned session_id
+    stateful: bool = False
+    session_id: Optional[str] = None
+    # "structured" returns the report as a dict instead of text
+    report_format: Literal["text", "structured"] = "text"
 
-@app.post("/chat")
-def chat(data: ChatRequest):
-    profile = data.patient_profile
-    new_text = data.new_text
-    confirmed = set(data.confirmed_symptoms)
-    denied = set(data.denied_symptoms)
 
-    # BMI calculation
-    height_m = profile.height_cm / 100
-    bmi = round(profile.weight_kg / (height_m ** 2), 1) if profile.height_cm else 25.0
+sessions = SessionStore(max_sessions=10000, ttl_seconds=1800)
+# Scored /chat turns by prediction_key. Only valid for the model loaded at
+# startup; a new model needs a restart (or prediction_cache.clear()).
+prediction_cache = LRUCache(max_entries=20000)
 
-    # 1. Extract new symptoms from free text
-    detected = extract_symptoms_from_text(new_text)
-    for sym in detected:
-        if sym not in denied:
-            confirmed.add(sym)
+common_index = {symptom: i for i, symptom in enumerate(common_symptoms)}
 
-    if not confirmed:
-        # No symptoms detected yet
-        return {
-            "type": "question",
-            "question_text": "I couldn't detect any specific symptoms. Could you describe how you're feeling in more detail?",
-            "symptom_id": None,
-            "confirmed_symptoms": list(confirmed),
-            "denied_symptoms": list(denied)
-        }
 
-    # 2. Build initial input vector
-    input_vector = np.zeros(len(common_symptoms))
-    for symptom in confirmed:
-        if symptom in common_symptoms:
-            idx = common_symptoms.index(symptom)
-            input_vector[idx] = 1
+rules = ClinicalRuleEngine(labels.classes_)
+
 
-    input_vector = input_vector.reshape(1, -1)
+# Model prior followed by Bayesian updates, one row per patient
+def initial_posteriors(confirmed_sets, denied_sets):
+    present_indices = [[] for _ in confirmed_sets]
+    present_mask = np.zeros((len(confirmed_sets), len(symptoms)), dtype=bool)
+    absent_mask = np.zeros((len(denied_sets), len(symptoms)), dtype=bool)
 
-    # 3. Predict & Bayesian Updates
-    current_probs = model.predict_proba(input_vector)[0]
+    for row, (confirmed, denied) in enumerate(zip(confirmed_sets, denied_sets)):
+        for symptom in confirmed:
+            if symptom in common_index:
+                present_indices[row].append(common_index[symptom])
+            present_mask[row, symptom_index[symptom]] = True
+        for symptom in denied:
+            absent_mask[row, symptom_index[symptom]] = True
 
-    for symptom in confirmed:
-        current_probs = bayesian_update(current_probs, symptom, disease_symptom_prob, labels, symptom_present=True)
-    for symptom in denied:
-        current_probs = bayesian_update(current_probs, symptom, disease_symptom_prob, labels, symptom_present=False)
+    prior = model.predict_indices(present_indices)
 
+    return bayesian_update_matrix(prior, present_mask, absent_mask, log_likelihoods)
+
+
+def profile_context(profile, bmi, confirmed=(), duration_weeks=0):
+    return patient_context(profile.age, bmi, profile.smoker, profile.family_history, confirmed, duration_weeks)
+
+
+# Smoothing and clinical heuristic boosts over a (patients x diseases) matrix
+def calibrate(raw_probs, profile_boost, contexts):
     # Smoothing
-    current_probs = np.power(current_probs, 0.75)
-    current_probs /= current_probs.sum()
+    current_probs = np.power(raw_probs, 0.75)
+    current_probs /= current_probs.sum(axis=1, keepdims=True)
+
+    # Clinical Heuristic Boosts
+    current_probs *= profile_boost
+    current_probs *= rules.boost_matrix(contexts, stages=("evidence",))
+
+    current_probs /= current_probs.sum(axis=1, keepdims=True)
+    return current_probs
 
-    # 4. Clinical Heuristic Boosts
-    duration_weeks = 0 # Assume 0 for stateless
-    match = re.search(r'(\d+)\s*week', new_text.lower())
+
+def compute_bmi(profile):
+    height_m = profile.height_cm / 100
+    return round(profile.weight_kg / (height_m ** 2), 1) if profile.height_cm else 25.0
+
+
+def parse_duration(text):
+    duration_weeks = 0
+    match = re.search(r'(\d+)\s*week', text.lower())
     if match: duration_weeks = int(match.group(1))
+    return duration_weeks
+
+
+# Add symptoms found in free text unless the patient already denied them
+def merge_detected(text, confirmed, denied):
+    detected = extract_symptoms_from_text(text)
+    for sym in detected:
+        if sym not in denied:
+            confirmed.add(sym)
 
-    if profile.age >= 60:
-        for i, disease in enumerate(labels.classes_):
-            if disease in ["Heart attack", "Pneumonia", "Hypertension"]: current_probs[i] *= 1.3
-    if bmi >= 30:
-        for i, disease in enumerate(labels.classes_):
-            if disease in ["Heart attack", "Hypertension"]: current_probs[i] *= 1.3
-    if profile.smoker:
-        for i, disease in enumerate(labels.classes_):
-            if disease in ["Tuberculosis", "Pneumonia", "Bronchial Asthma"]: current_probs[i] *= 1.4
-    if profile.family_history:
-        for i, disease in enumerate(labels.classes_):
-            if disease == "Heart attack": current_probs[i] *= 1.6
-    if {"high_fever", "cough"} <= confirmed:
-        for i, disease in enumerate(labels.classes_):
-            if disease in ["Pneumonia", "Common Cold", "Tuberculosis"]: current_probs[i] *= 2.0
-    if duration_weeks >= 3 and "blood_in_sputum" in confirmed:
-        for i, disease in enumerate(labels.classes_):
-            if disease == "Tuberculosis": current_probs[i] *= 2.0
-    if "weakness_of_one_body_side" in confirmed or "slurred_speech" in confirmed:
-        for i, disease in enumerate(labels.classes_):
-            if "Paralysis" in disease: current_probs[i] *= 4.0
-
-    current_probs /= current_probs.sum()
-
-    # 5. Check Emergency Flags
-    emergency_flag = False
-    severe_cluster = {"high_fever", "chills", "fast_heart_rate", "altered_sensorium"}
-
-    if "weakness_of_one_body_side" in confirmed or "slurred_speech" in confirmed: emergency_flag = True
-    elif {"chest_pain", "shortness_of_breath"} <= confirmed: emergency_flag = True
-    elif "blood_in_sputum" in confirmed: emergency_flag = True
-    elif severe_cluster.issubset(confirmed): emergency_flag = True
-    elif "high_fever" in confirmed and "altered_sensorium" in confirmed: emergency_flag = True
+
+def no_symptoms_response(confirmed, denied):
+    return {
+        "type": "question",
+        "question_text": "I couldn't detect any specific symptoms. Could you describe how you're feeling in more detail?",
+        "symptom_id": None,
+        "confirmed_symptoms": list(confirmed),
+        "denied_symptoms": list(denied)
+    }
+
+
+# Emergency flags and follow-up question for one patient. Depends only on the
+# evidence, the profile buckets and gender, so the result can be cached.
+def plan_turn(current_probs, gender, context, denied):
+    confirmed = context["symptoms"]
 
     sorted_probs = np.sort(current_probs)[::-1]
     top3 = np.argsort(current_probs)[-3:][::-1]
     top_disease = labels.inverse_transform([top3[0]])[0]
-    
-    if top_disease == "Heart attack" and current_probs[top3[0]] > 0.40:
-        emergency_flag = True
 
-    # 6. Decide to ask question or return report
+    # Emergency flags (symptom clusters and the heart attack probability override)
+    context["top_disease"] = top_disease
+    context["top_probability"] = current_probs[top3[0]]
+    emergency_flag = rules.emergency_message(context) is not None
+
+    # Decide to ask question or return report
     # We ask a question if NOT emergency AND NOT highly confident
     is_confident = (sorted_probs[0] - sorted_probs[1] >= 0.15) and confirmed != {"altered_sensorium"}
-    
+
+    next_symptom = None
     # Cap maximum questions by length of denied + confirmed (to prevent infinite loops)
     if not emergency_flag and not is_confident and len(confirmed) + len(denied) < 15:
         # Exclude already asked symptoms
         already_asked = confirmed.union(denied)
-        next_symptom = select_best_question(current_probs, disease_symptom_prob, labels, already_asked, profile.gender.lower())
-        
-        if next_symptom:
-            sym_readable = next_symptom.replace("_", " ")
-            return {
-                "type": "question",
-                "question_text": f"Do you have {sym_readable}?",
-                "symptom_id": next_symptom,
-                "confirmed_symptoms": list(confirmed),
-                "denied_symptoms": list(denied)
-            }
-
-    # 7. Generate Final Report
-    report = generate_clinical_response(top_disease, list(confirmed), profile.age, profile.smoker, bmi)
-    
-    if emergency_flag:
-        report = "🔴 **EMERGENCY ALERT:** Based on your symptoms, please seek immediate medical care.\n\n" + report
+        next_symptom = choose_question(current_probs, symptom_prob_matrix, symptoms, already_asked, gender, mode=DEFAULT_QUESTION_MODE)
 
     return {
-        "type": "report",
         "top_disease": top_disease,
+        "top_label": int(top3[0]),
+        "predictions": tuple((labels.inverse_transform([idx])[0], float(current_probs[idx])) for idx in top3),
+        "emergency": emergency_flag,
+        "next_symptom": next_symptom,
+    }
+
+
+# Question or final report for a planned turn
+def render_turn(turn, profile, bmi, confirmed, denied, report_format="text"):
+    next_symptom = turn["next_symptom"]
+
+    if next_symptom:
+        sym_readable = next_symptom.replace("_", " ")
+        return {
+            "type": "question",
+            "question_text": f"Do you have {sym_readable}?",
+            "symptom_id": next_symptom,
+            "confirmed_symptoms": list(confirmed),
+            "denied_symptoms": list(denied)
+        }
+
+    # Generate Final Report
+    if report_format == "structured":
+        report = generate_structured_response(
+            turn["top_disease"], list(confirmed), profile.age, profile.smoker, bmi, label_id=turn["top_label"]
+        )
+        report["emergency"] = turn["emergency"]
+    else:
+        report = generate_clinical_response(
+            turn["top_disease"], list(confirmed), profile.age, profile.smoker, bmi, label_id=turn["top_label"]
+        )
+        if turn["emergency"]:
+            report = "🔴 **EMERGENCY ALERT:** Based on your symptoms, please seek immediate medical care.\n\n" + report
+
+    return {
+        "type": "report",
+        "top_disease": turn["top_disease"],
         "report": report,
         "confirmed_symptoms": list(confirmed),
         "denied_symptoms": list(denied),
-        "predictions": [{"disease": labels.inverse_transform([idx])[0], "probability": float(current_probs[idx])} for idx in top3]
-    }
\ No newline at end of file
+        "predictions": [{"disease": disease, "probability": probability} for disease, probability in turn["predictions"]]
+    }
+
+
+def build_response(current_probs, profile, bmi, context, denied, report_format="text"):
+    turn = plan_turn(current_probs, profile.gender.lower(), context, denied)
+    return render_turn(turn, profile, bmi, context["symptoms"], denied, report_format)
+
+
+@app.post("/chat")
+def chat(data: ChatRequest):
+    session = None
+    if data.session_id:
+        session = sessions.get(data.session_id)
+    if session is None and (data.stateful or data.session_id):
+        # Unknown or expired sessions are rebuilt from the evidence sent with the request
+        session = sessions.create()
+
+    if session is None:
+        return chat_turn(data, None)
+
+    # Two concurrent turns on one session would both apply the same new
+    # evidence to its posterior; the read-update-write runs under its lock
+    with session["lock"]:
+        return chat_turn(data, session)
+
+
+def chat_turn(data, session):
+    profile = data.patient_profile
+    confirmed = set(data.confirmed_symptoms)
+    denied = set(data.denied_symptoms)
+
+    if session is not None:
+        confirmed |= session["confirmed"]
+        denied |= session["denied"]
+
+    bmi = compute_bmi(profile)
+
+    # 1. Extract new symptoms from free text
+    merge_detected(data.new_text, confirmed, denied)
+
+    if not confirmed:
+        # No symptoms detected yet
+        response = no_symptoms_response(confirmed, denied)
+        if session is not None:
+            session["denied"] = denied
+            response["session_id"] = session["session_id"]
+        return response
+
+    duration_weeks = parse_duration(data.new_text)
+
+    # Stateless turns with the same evidence and profile buckets reuse a cached plan
+    if session is None:
+        key = prediction_key(confirmed, denied, profile, bmi, duration_weeks)
+        turn = prediction_cache.get(key)
+        if turn is None:
+            # 2-4. Predict, Bayesian updates, smoothing & boosts
+            context = profile_context(profile, bmi, confirmed, duration_weeks)
+            raw_probs = initial_posteriors([confirmed], [denied])[0]
+            boost = rules.boost_vector(profile_context(profile, bmi), stages=("profile",))
+            current_probs = calibrate(raw_probs[None, :], boost[None, :], [context])[0]
+
+            # 5-6. Emergency flags & follow-up question
+            turn = plan_turn(current_probs, profile.gender.lower(), context, denied)
+            prediction_cache.put(key, turn)
+
+        return render_turn(turn, profile, bmi, confirmed, denied, data.report_format)
+
+    # 2-3. Predict & Bayesian Updates
+    if session["posterior"] is None:
+        session["posterior"] = initial_posteriors([confirmed], [denied])[0]
+    else:
+        # Only the evidence this session has not seen yet
+        session["posterior"] = bayesian_update_batch(
+            session["posterior"],
+            [symptom_index[s] for s in confirmed - session["confirmed"]],
+            [symptom_index[s] for s in denied - session["denied"]],
+            log_likelihoods
+        )
+
+    profile_data = profile.model_dump()
+    if session["profile"] != profile_data:
+        session["profile"] = profile_data
+        session["boost"] = rules.boost_vector(profile_context(profile, bmi), stages=("profile",))
+
+    session["confirmed"] = set(confirmed)
+    session["denied"] = set(denied)
+    session["duration_weeks"] = max(session["duration_weeks"], duration_weeks)
+
+    raw_probs = session["posterior"]
+    boost = session["boost"]
+    duration_weeks = session["duration_weeks"]
+
+    # 4. Smoothing & Clinical Heuristic Boosts
+    context = profile_context(profile, bmi, confirmed, duration_weeks)
+    current_probs = calibrate(raw_probs[None, :], boost[None, :], [context])[0]
+
+    # 5-7. Emergency flags, follow-up question or final report
+    response = build_response(current_probs, profile, bmi, context, denied, data.report_format)
+    response["session_id"] = session["session_id"]
+    return response
+
+
+# Score many independent turns at once: one predict_proba call and array-wide
+# Bayesian updates, smoothing and boosts. Items are always scored statelessly.
+@app.post("/chat/batch")
+def chat_batch(requests: list[ChatRequest]):
+    responses = [None] * len(requests)
+    rows = []
+
+    for i, data in enumerate(requests):
+        confirmed = set(data.confirmed_symptoms)
+        denied = set(data.denied_symptoms)
+        merge_detected(data.new_text, confirmed, denied)
+
+        if not confirmed:
+            responses[i] = no_symptoms_response(confirmed, denied)
+            continue
+
+        profile = data.patient_profile
+        bmi = compute_bmi(profile)
+        context = profile_context(profile, bmi, confirmed, parse_duration(data.new_text))
+        rows.append((i, profile, bmi, context, denied))
+
+    if not rows:
+        return responses
+
+    indices, profiles, bmis, contexts, denied_sets = map(list, zip(*rows))
+
+    raw_probs = initial_posteriors([c["symptoms"] for c in contexts], denied_sets)
+    current_probs = calibrate(raw_probs, rules.boost_matrix(contexts, stages=("profile",)), contexts)
+
+    for row, i in enumerate(indices):
+        responses[i] = build_response(
+            current_probs[row], profiles[row], bmis[row], contexts[row], denied_sets[row], requests[i].report_format
+        )
+
+    return responses
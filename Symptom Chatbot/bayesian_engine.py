@@ -1,5 +1,7 @@
 import numpy as np
 
+EPSILON = 0.005 # Preventing 100% disease prediction
+
 def normalize(prob_vector):
     total = np.sum(prob_vector)
     if total == 0:
@@ -12,10 +14,9 @@ def bayesian_update(current_probs, symptom, disease_symptom_prob, labels, sympto
 
     for i, disease in enumerate(labels.classes_):
 
-        epsilon = 0.005 # Preventing 100% disease prediction
         raw_likelihood = disease_symptom_prob[disease][symptom]
         # Smoothing, Laplace style
-        likelihood = raw_likelihood * (1 - epsilon) + epsilon
+        likelihood = raw_likelihood * (1 - EPSILON) + EPSILON
 
         if not symptom_present:
             likelihood = 1 - likelihood
@@ -29,6 +30,76 @@ def bayesian_update(current_probs, symptom, disease_symptom_prob, labels, sympto
     return updated_probs
 
 
+# Smoothed P(symptom | disease) for a whole (diseases x symptoms) matrix
+def smooth_likelihoods(prob_matrix, epsilon=EPSILON):
+    return np.asarray(prob_matrix, dtype=np.float64) * (1 - epsilon) + epsilon
+
+
+# Log-likelihood columns for the batched update (diseases x symptoms, float32)
+def build_log_likelihoods(prob_matrix, epsilon=EPSILON):
+    likelihood = smooth_likelihoods(prob_matrix, epsilon)
+
+    # log(0) -> -inf keeps "certain symptom denied" at exactly zero posterior
+    with np.errstate(divide="ignore"):
+        log_present = np.log(likelihood).astype(np.float32)
+        log_absent = np.log(1 - likelihood).astype(np.float32)
+
+    return log_present, log_absent
+
+
+# Apply all present/absent evidence at once as one log-space sum of columns.
+# Equivalent to chaining bayesian_update over every symptom.
+def bayesian_update_batch(current_probs, present_idx, absent_idx, log_likelihoods):
+    log_present, log_absent = log_likelihoods
+
+    with np.errstate(divide="ignore"):
+        log_probs = np.log(np.asarray(current_probs, dtype=np.float64))
+
+    log_probs = (
+        log_probs
+        + log_present[:, list(present_idx)].sum(axis=1, dtype=np.float64)
+        + log_absent[:, list(absent_idx)].sum(axis=1, dtype=np.float64)
+    )
+
+    max_log = np.max(log_probs)
+    if not np.isfinite(max_log):
+        return np.zeros_like(log_probs)
+
+    return normalize(np.exp(log_probs - max_log))
+
+
+# Batched update for many patients: one row of prob_matrix per patient and
+# boolean (patients x symptoms) masks for present/absent evidence.
+def bayesian_update_matrix(prob_matrix, present_mask, absent_mask, log_likelihoods):
+    log_present, log_absent = log_likelihoods
+
+    impossible = np.isneginf(log_absent)
+    finite_absent = np.where(impossible, 0, log_absent).astype(np.float64)
+
+    present_mask = np.asarray(present_mask, dtype=np.float64)
+    absent_mask = np.asarray(absent_mask, dtype=np.float64)
+
+    with np.errstate(divide="ignore"):
+        log_probs = np.log(np.asarray(prob_matrix, dtype=np.float64))
+
+    log_probs = (
+        log_probs
+        + present_mask @ log_present.astype(np.float64).T
+        + absent_mask @ finite_absent.T
+    )
+    # Denying a symptom the disease always has rules the disease out
+    log_probs[(absent_mask @ impossible.T.astype(np.float64)) > 0] = -np.inf
+
+    max_log = np.max(log_probs, axis=1, keepdims=True)
+    dead = ~np.isfinite(max_log)
+
+    probs = np.exp(log_probs - np.where(dead, 0, max_log))
+    probs[dead[:, 0]] = 0
+
+    totals = probs.sum(axis=1, keepdims=True)
+    return probs / np.where(totals == 0, 1, totals)
+
+
 def check_convergence(current_probs, threshold=0.75):
     max_prob = np.max(current_probs)
     return max_prob >= threshold
\ No newline at end of file
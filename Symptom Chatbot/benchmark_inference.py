@@ -0,0 +1,52 @@
+import time
+import numpy as np
+import joblib as jb
+from all_symptoms import common_symptoms
+from symptom_model import SymptomModel
+
+# Compares the sklearn wrapper (dense 1 x N predict_proba, as /chat used to
+# call it) with the booster fast path, uncached and cached.
+N_REQUESTS = 300
+DISTINCT_SETS = 60 # Repeated symptom sets, as in real /chat traffic
+SEED = 42
+
+MODEL_PATH = "disease_prediction_model.pkl"
+
+
+def make_requests(rng):
+    sets = [
+        rng.choice(len(common_symptoms), size=rng.integers(1, 6), replace=False).tolist()
+        for _ in range(DISTINCT_SETS)
+    ]
+    return [sets[i] for i in rng.integers(0, DISTINCT_SETS, size=N_REQUESTS)]
+
+
+def wrapper_predict(classifier, indices):
+    input_vector = np.zeros((1, len(common_symptoms)))
+    input_vector[0, indices] = 1
+    return classifier.predict_proba(input_vector)[0]
+
+
+def timed(name, predict, requests):
+    start = time.perf_counter()
+    results = [predict(indices) for indices in requests]
+    elapsed = time.perf_counter() - start
+
+    print(f"{name:<28} {elapsed / len(requests) * 1000:.3f} ms/request")
+    return np.vstack(results)
+
+
+if __name__ == "__main__":
+    requests = make_requests(np.random.default_rng(SEED))
+    print(f"{N_REQUESTS} requests over {DISTINCT_SETS} distinct symptom sets\n")
+
+    classifier = jb.load(MODEL_PATH)
+    uncached = SymptomModel(MODEL_PATH, cache_size=0)
+    cached = SymptomModel(MODEL_PATH)
+
+    baseline = timed("sklearn predict_proba", lambda indices: wrapper_predict(classifier, indices), requests)
+    fast = timed("booster inplace_predict", uncached.predict_one, requests)
+    hot = timed("booster + result cache", cached.predict_one, requests)
+
+    print(f"\nMax abs difference vs sklearn: {max(np.abs(fast - baseline).max(), np.abs(hot - baseline).max()):.2e}")
+    print(f"Cache: {cached.cache_info()}")
@@ -0,0 +1,103 @@
+import time
+import numpy as np
+import joblib as jb
+from all_symptoms import symptoms, common_symptoms, symptom_prob_matrix, symptom_index, log_likelihoods
+from bayesian_engine import bayesian_update_batch
+from question_selector import select_question
+from question_planner import plan_question, plan_cache, CONFIDENCE_MARGIN
+
+# Synthetic patients: each disease row of P(symptom | disease) is sampled,
+# the patient volunteers one true symptom and answers follow-ups truthfully.
+PATIENTS_PER_DISEASE = 10
+MAX_EVIDENCE = 15 # Same cap as /chat
+SEED = 42
+
+model = jb.load("disease_prediction_model.pkl")
+common_index = {symptom: i for i, symptom in enumerate(common_symptoms)}
+
+
+def make_patients(rng):
+    patients = []
+    for disease in range(symptom_prob_matrix.shape[0]):
+        for _ in range(PATIENTS_PER_DISEASE):
+            present = rng.random(symptom_prob_matrix.shape[1]) < symptom_prob_matrix[disease]
+            if present.any():
+                patients.append((disease, present, int(rng.choice(np.flatnonzero(present)))))
+    return patients
+
+
+def smoothed(probs):
+    probs = np.power(probs, 0.75)
+    return probs / probs.sum()
+
+
+def run_patient(select, disease, present, first_symptom):
+    confirmed = {symptoms[first_symptom]}
+    denied = set()
+
+    input_vector = np.zeros((1, len(common_symptoms)))
+    if symptoms[first_symptom] in common_index:
+        input_vector[0, common_index[symptoms[first_symptom]]] = 1
+
+    posterior = bayesian_update_batch(model.predict_proba(input_vector)[0], [first_symptom], [], log_likelihoods)
+
+    questions = 0
+    select_time = 0.0
+
+    while len(confirmed) + len(denied) < MAX_EVIDENCE:
+        probs = smoothed(posterior)
+        top2 = np.sort(probs)[-2:]
+        if top2[1] - top2[0] >= CONFIDENCE_MARGIN:
+            break
+
+        start = time.perf_counter()
+        question = select(probs, confirmed | denied)
+        select_time += time.perf_counter() - start
+
+        if question is None:
+            break
+
+        questions += 1
+        idx = symptom_index[question]
+        if present[idx]:
+            confirmed.add(question)
+            posterior = bayesian_update_batch(posterior, [idx], [], log_likelihoods)
+        else:
+            denied.add(question)
+            posterior = bayesian_update_batch(posterior, [], [idx], log_likelihoods)
+
+    probs = smoothed(posterior)
+    top2 = np.sort(probs)[-2:]
+    return questions, top2[1] - top2[0] >= CONFIDENCE_MARGIN, int(np.argmax(probs)) == disease, select_time
+
+
+def benchmark(name, select, patients):
+    results = [run_patient(select, *patient) for patient in patients]
+    questions, confident, correct, select_time = map(np.array, zip(*results))
+
+    print(
+        f"{name:<22} avg questions: {questions.mean():.2f}  "
+        f"reached margin: {confident.mean() * 100:.1f}%  "
+        f"top-1 accuracy: {correct.mean() * 100:.1f}%  "
+        f"avg select time: {select_time.sum() / max(1, questions.sum()) * 1000:.2f} ms"
+    )
+
+
+MODES = {
+    "variance": lambda probs, asked: select_question(probs, symptom_prob_matrix, symptoms, asked, "male", mode="variance"),
+    "information_gain": lambda probs, asked: select_question(probs, symptom_prob_matrix, symptoms, asked, "male", mode="information_gain"),
+    "planner (depth 1)": lambda probs, asked: plan_question(probs, symptom_prob_matrix, symptoms, asked, "male", depth=1),
+    "planner (depth 2)": lambda probs, asked: plan_question(probs, symptom_prob_matrix, symptoms, asked, "male", depth=2),
+    "planner (depth 3)": lambda probs, asked: plan_question(probs, symptom_prob_matrix, symptoms, asked, "male", depth=3),
+}
+
+
+if __name__ == "__main__":
+    patients = make_patients(np.random.default_rng(SEED))
+    print(f"{len(patients)} synthetic patients, confidence margin {CONFIDENCE_MARGIN}\n")
+
+    for name, select in MODES.items():
+        plan_cache.clear()
+        benchmark(name, select, patients)
+
+    print(f"\nPlanner cache: {len(plan_cache)} entries, {plan_cache.hits} hits, {plan_cache.misses} misses")
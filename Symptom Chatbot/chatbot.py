@@ -2,12 +2,15 @@ import joblib as jb
 import numpy as np
 import re
 
-from all_symptoms import common_symptoms, disease_symptom_prob
-from bayesian_engine import bayesian_update
+from all_symptoms import symptoms, common_symptoms, symptom_prob_matrix, label_classes, symptom_index, log_likelihoods
+from bayesian_engine import bayesian_update_batch
 from symptom_mapper import extract_symptoms_from_text
 from clinical_response_engine import generate_clinical_response
-from question_selector import select_best_question
-from all_symptoms import common_symptoms, disease_symptom_prob
+from question_planner import choose_question
+from question_selector import DEFAULT_QUESTION_MODE
+from clinical_rules import ClinicalRuleEngine, patient_context
+from symptom_knowledge import check_label_encoder
+from medication_store import medication_store
 
 # Safe input functions
 def get_int(prompt):
@@ -49,6 +52,9 @@ def get_yes_no_or_stop(prompt):
 # Load Model
 model = jb.load("disease_prediction_model.pkl")
 labels = jb.load("label_encoder.pkl")
+check_label_encoder(labels, label_classes)
+medication_store.bind_labels(labels.classes_)
+rules = ClinicalRuleEngine(labels.classes_)
 
 print("\nHi. I’m here to help understand what might be going on.\n")
 
@@ -76,6 +82,7 @@ family_history = get_yes_no("Family history of heart disease? (yes/no): ")
 print("\nDescribe your symptoms:\n")
 
 asked_symptoms = set()
+denied_symptoms = set()
 current_probs = None
 
 # Main loop
@@ -108,36 +115,11 @@ while True:
 
     asked_symptoms.update(detected)
 
-    # Emergency heuristics
-    emergency_flag = False
-    emergency_message = ""
-
-    severe_cluster = {
-        "high_fever",
-        "chills",
-        "fast_heart_rate",
-        "altered_sensorium"
-    }
-
-    if "weakness_of_one_body_side" in asked_symptoms or "slurred_speech" in asked_symptoms:
-        emergency_flag = True
-        emergency_message = "Possible stroke. Seek immediate care."
+    context = patient_context(age, bmi, smoker == "yes", family_history == "yes", asked_symptoms, duration_weeks)
 
-    elif {"chest_pain", "shortness_of_breath"} <= asked_symptoms:
-        emergency_flag = True
-        emergency_message = "Possible cardiac event. Seek immediate care."
-
-    elif "blood_in_sputum" in asked_symptoms:
-        emergency_flag = True
-        emergency_message = "Coughing blood requires urgent evaluation."
-
-    elif severe_cluster.issubset(asked_symptoms):
-        emergency_flag = True
-        emergency_message = "Possible severe infection."
-    # Fever + confusion override
-    elif "high_fever" in asked_symptoms and "altered_sensorium" in asked_symptoms:
-        emergency_flag = True
-        emergency_message = "Fever with confusion may indicate severe infection."
+    # Emergency heuristics
+    emergency_message = rules.emergency_message(context, stages=("symptoms",))
+    emergency_flag = emergency_message is not None
 
     # Input vector build
     input_vector = np.zeros(len(common_symptoms))
@@ -153,61 +135,19 @@ while True:
     if current_probs is None:
         current_probs = model.predict_proba(input_vector)[0]
     else:
-        for symptom in detected:
-            current_probs = bayesian_update(
-                current_probs,
-                symptom,
-                disease_symptom_prob,
-                labels,
-                symptom_present=True
-            )
+        current_probs = bayesian_update_batch(
+            current_probs,
+            [symptom_index[s] for s in detected],
+            [],
+            log_likelihoods
+        )
 
     # Calibration smoothing (stable)
     current_probs = np.power(current_probs, 0.75)
     current_probs /= current_probs.sum()
 
     # Clinical heuristics adjustments (boosting)
-    # Age boost
-    if age >= 60:
-        for i, disease in enumerate(labels.classes_):
-            if disease in ["Heart attack", "Pneumonia", "Hypertension"]:
-                current_probs[i] *= 1.3
-
-    # Obesity boost
-    if bmi >= 30:
-        for i, disease in enumerate(labels.classes_):
-            if disease in ["Heart attack", "Hypertension"]:
-                current_probs[i] *= 1.3
-
-    # Smoking boost
-    if smoker == "yes":
-        for i, disease in enumerate(labels.classes_):
-            if disease in ["Tuberculosis", "Pneumonia", "Bronchial Asthma"]:
-                current_probs[i] *= 1.4
-
-    # Family cardiac boost
-    if family_history == "yes":
-        for i, disease in enumerate(labels.classes_):
-            if disease == "Heart attack":
-                current_probs[i] *= 1.6
-
-    # Infectious cluster boost
-    if {"high_fever", "cough"} <= asked_symptoms:
-        for i, disease in enumerate(labels.classes_):
-            if disease in ["Pneumonia", "Common Cold", "Tuberculosis"]:
-                current_probs[i] *= 2.0
-
-    # Chronic hemoptysis boost
-    if duration_weeks >= 3 and "blood_in_sputum" in asked_symptoms:
-        for i, disease in enumerate(labels.classes_):
-            if disease == "Tuberculosis":
-                current_probs[i] *= 2.0
-
-    # Stroke boost
-    if "weakness_of_one_body_side" in asked_symptoms or "slurred_speech" in asked_symptoms:
-        for i, disease in enumerate(labels.classes_):
-            if "Paralysis" in disease:
-                current_probs[i] *= 4.0
+    current_probs *= rules.boost_vector(context, stages=("profile", "evidence"))
 
     current_probs /= current_probs.sum()
 
@@ -223,12 +163,13 @@ while True:
         if (sorted_probs[0] - sorted_probs[1] >= 0.15) and asked_symptoms != {"altered_sensorium"}:
             break
 
-        question = select_best_question(
+        question = choose_question(
             current_probs,
-            disease_symptom_prob,
-            labels,
-            asked_symptoms,
-            gender
+            symptom_prob_matrix,
+            symptoms,
+            asked_symptoms | denied_symptoms,
+            gender,
+            mode=DEFAULT_QUESTION_MODE
         )
 
         if not question:
@@ -240,23 +181,22 @@ while True:
             print("\nStopping follow-up questions.")
             break
 
-        current_probs = bayesian_update(
+        question_idx = [symptom_index[question]]
+        current_probs = bayesian_update_batch(
             current_probs,
-            question,
-            disease_symptom_prob,
-            labels,
-            symptom_present=(answer == "yes")
+            question_idx if answer == "yes" else [],
+            question_idx if answer == "no" else [],
+            log_likelihoods
         )
 
         if answer == "yes":
             asked_symptoms.add(question)
+        else:
+            denied_symptoms.add(question)
 
         current_probs = np.power(current_probs, 0.75)
-        fever_present = any(sym in asked_symptoms for sym in ["high_fever", "mild_fever", "fever"])
-        if "cough" in asked_symptoms and fever_present:
-            for i, disease in enumerate(labels.classes_):
-                if disease == "Common Cold":
-                    current_probs[i] *= 1.15
+        context["symptoms"] = set(asked_symptoms)
+        current_probs *= rules.boost_vector(context, stages=("followup",))
         current_probs /= current_probs.sum()
 
     # Final ranking
@@ -267,9 +207,12 @@ while True:
     top_disease_name = labels.inverse_transform([top_index])[0]
     top_conf = current_probs[top_index]
 
-    if top_disease_name == "Heart attack" and top_conf > 0.40:
+    context["top_disease"] = top_disease_name
+    context["top_probability"] = top_conf
+    override_message = rules.emergency_message(context, stages=("prediction",))
+    if override_message:
         emergency_flag = True
-        emergency_message = "High probability of cardiac event."
+        emergency_message = override_message
 
     print("\nPossible Conditions:\n")
     for idx in top3:
@@ -292,7 +235,8 @@ report = generate_clinical_response(
     list(asked_symptoms),
     age,
     smoker == "yes",
-    bmi
+    bmi,
+    label_id=int(top3[0])
 )
 
 print(report)
\ No newline at end of file
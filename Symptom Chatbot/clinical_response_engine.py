@@ -1,52 +1,115 @@
-from disease_medications import DISEASE_MEDICATIONS
+from medication_store import medication_store
 
-from disease_medications import DISEASE_MEDICATIONS
+REPORT_FORMATS = ("text", "structured")
 
-def generate_clinical_response(disease, symptoms, age, smoker, bmi):
-    output = ""
-    output += "\n\n AI CLINICAL REPORT"
-    # BMI classification
+NO_MEDICATION_DATA = "No detailed medication database available."
+
+DISCLAIMER = "Important: This is a simplified overview. Medication choices depend on individual factors and should be made in consultation with a healthcare provider."
+
+
+def bmi_category(bmi):
     if bmi < 18.5:
-        bmi_category = "Underweight"
+        return "Underweight"
     elif bmi < 25:
-        bmi_category = "Normal weight"
+        return "Normal weight"
     elif bmi < 30:
-        bmi_category = "Overweight"
-    else:
-        bmi_category = "Obese"
+        return "Overweight"
+    return "Obese"
 
-    output += f"\nBMI: {bmi} ({bmi_category})\n"
-    output += f"\nMost Likely Condition: {disease}\n"
 
-    output += "\nRisk Factors:\n"
+def risk_factors(age, smoker, bmi):
+    factors = []
 
     if age >= 65:
-        output += "- Age increases risk of complications\n"
+        factors.append("Age increases risk of complications")
 
     if smoker:
-        output += "- Smoking increases cardiopulmonary risk\n"
+        factors.append("Smoking increases cardiopulmonary risk")
 
     if bmi >= 30:
-        output += "- Obesity increases cardiovascular risk\n"
+        factors.append("Obesity increases cardiovascular risk")
+
+    return factors
+
+
+# Text block from the overview to the end of the report
+def render_medication_section(disease):
+    parts = ["\nRecommended Medication Overview:\n", f"\n{disease['overview']}\n"]
+
+    for med in disease["medications"]:
+        parts.append("\n\n")
+        parts.append(f"Medication: {med.get('name', 'N/A')}\n")
+        parts.append(f"Class: {med.get('class', 'N/A')}\n")
+        parts.append(f"Typical Use: {med.get('use', med.get('purpose', 'N/A'))}\n")
+        parts.append(f"General Dose Info: {med.get('dose', med.get('dose_info', 'N/A'))}\n")
+        parts.append(f"Timing: {med.get('timing', 'N/A')}\n")
+        parts.append(f"Warnings: {med.get('warnings', 'N/A')}\n")
+
+    parts.append(f"\n\n{DISCLAIMER}")
+    parts.append("\n\n")
+    return "".join(parts)
 
-    if disease not in DISEASE_MEDICATIONS:
-        output += "\nNo detailed medication database available.\n"
-        return output
 
-    data = DISEASE_MEDICATIONS[disease]
+def structure_medication_section(disease):
+    return {
+        "overview": disease["overview"],
+        "medications": [
+            {
+                "name": med.get("name"),
+                "class": med.get("class"),
+                "typical_use": med.get("typical_use"),
+                "general_dose_info": med.get("general_dose_info"),
+                "timing_info": med.get("timing_info"),
+                "warnings": med.get("warnings"),
+            }
+            for med in disease["medications"]
+        ],
+    }
+
+
+# A disease always gets the same medication block, so both forms are built
+# once, indexed like medication_store.diseases
+MEDICATION_SECTIONS = [render_medication_section(disease) for disease in medication_store.diseases]
+MEDICATION_STRUCTURED = [structure_medication_section(disease) for disease in medication_store.diseases]
+
+
+# label_id (the model class) skips the name lookup; medication_store must be bound
+def _disease_id(disease, label_id):
+    if label_id is not None:
+        return medication_store.disease_id_for_label(label_id)
+    return medication_store.disease_id(disease)
+
+
+def generate_clinical_response(disease, symptoms, age, smoker, bmi, label_id=None):
+    parts = [
+        "\n\n AI CLINICAL REPORT",
+        f"\nBMI: {bmi} ({bmi_category(bmi)})\n",
+        f"\nMost Likely Condition: {disease}\n",
+        "\nRisk Factors:\n",
+    ]
+    parts.extend(f"- {factor}\n" for factor in risk_factors(age, smoker, bmi))
+
+    disease_id = _disease_id(disease, label_id)
+    if disease_id is None:
+        parts.append(f"\n{NO_MEDICATION_DATA}\n")
+    else:
+        parts.append(MEDICATION_SECTIONS[disease_id])
+
+    return "".join(parts)
 
-    output += "\nRecommended Medication Overview:\n"
-    output += f"\n{data.get('overview', '')}\n"
 
-    for med in data.get("medications", []):
-        output += "\n\n"
-        output += f"Medication: {med.get('name', 'N/A')}\n"
-        output += f"Class: {med.get('class', 'N/A')}\n"
-        output += f"Typical Use: {med.get('use', med.get('purpose', 'N/A'))}\n"
-        output += f"General Dose Info: {med.get('dose', med.get('dose_info', 'N/A'))}\n"
-        output += f"Timing: {med.get('timing', 'N/A')}\n"
-        output += f"Warnings: {med.get('warnings', 'N/A')}\n"
+# Same report as a dict, for clients that should not parse the text
+def generate_structured_response(disease, symptoms, age, smoker, bmi, label_id=None):
+    disease_id = _disease_id(disease, label_id)
+    medication = None if disease_id is None else MEDICATION_STRUCTURED[disease_id]
 
-    output += "\n\nImportant: This is a simplified overview. Medication choices depend on individual factors and should be made in consultation with a healthcare provider."
-    output += "\n\n"
-    return output
\ No newline at end of file
+    return {
+        "bmi": bmi,
+        "bmi_category": bmi_category(bmi),
+        "condition": disease,
+        "symptoms": list(symptoms),
+        "risk_factors": risk_factors(age, smoker, bmi),
+        "medication_overview": medication["overview"] if medication else None,
+        "medications": [dict(med) for med in medication["medications"]] if medication else [],
+        "disclaimer": DISCLAIMER if medication else NO_MEDICATION_DATA,
+    }
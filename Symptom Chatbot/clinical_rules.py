@@ -0,0 +1,152 @@
+import numpy as np
+
+# Declarative clinical heuristics shared by /chat and the CLI chatbot.
+#
+# Every rule has a list of conditions that must all hold for a patient. A
+# condition is (field, op, value) over the patient context built by
+# patient_context(): ops ">=", ">", "==" compare a field, "all"/"any" test
+# the patient's symptom set.
+#
+# Boost rules multiply the listed diseases (exact label names, or labels
+# containing `disease_contains`) by `factor`. `stage` says when a rule
+# applies: "profile" rules depend only on the patient profile, "evidence"
+# rules on reported symptoms, "followup" rules run after each CLI follow-up.
+BOOST_RULES = [
+    {"name": "age", "stage": "profile",
+     "when": [("age", ">=", 60)],
+     "diseases": ["Heart attack", "Pneumonia", "Hypertension"], "factor": 1.3},
+
+    {"name": "obesity", "stage": "profile",
+     "when": [("bmi", ">=", 30)],
+     "diseases": ["Heart attack", "Hypertension"], "factor": 1.3},
+
+    {"name": "smoking", "stage": "profile",
+     "when": [("smoker", "==", True)],
+     "diseases": ["Tuberculosis", "Pneumonia", "Bronchial Asthma"], "factor": 1.4},
+
+    {"name": "family_cardiac", "stage": "profile",
+     "when": [("family_history", "==", True)],
+     "diseases": ["Heart attack"], "factor": 1.6},
+
+    {"name": "infectious_cluster", "stage": "evidence",
+     "when": [("symptoms", "all", ["high_fever", "cough"])],
+     "diseases": ["Pneumonia", "Common Cold", "Tuberculosis"], "factor": 2.0},
+
+    {"name": "chronic_hemoptysis", "stage": "evidence",
+     "when": [("duration_weeks", ">=", 3), ("symptoms", "all", ["blood_in_sputum"])],
+     "diseases": ["Tuberculosis"], "factor": 2.0},
+
+    {"name": "stroke", "stage": "evidence",
+     "when": [("symptoms", "any", ["weakness_of_one_body_side", "slurred_speech"])],
+     "disease_contains": "Paralysis", "factor": 4.0},
+
+    {"name": "cough_with_fever", "stage": "followup",
+     "when": [("symptoms", "all", ["cough"]), ("symptoms", "any", ["high_fever", "mild_fever", "fever"])],
+     "diseases": ["Common Cold"], "factor": 1.15},
+]
+
+# Emergency rules, checked in order; the first match gives the reason.
+# "prediction" rules look at the final ranking (top_disease / top_probability).
+EMERGENCY_RULES = [
+    {"stage": "symptoms",
+     "when": [("symptoms", "any", ["weakness_of_one_body_side", "slurred_speech"])],
+     "message": "Possible stroke. Seek immediate care."},
+
+    {"stage": "symptoms",
+     "when": [("symptoms", "all", ["chest_pain", "shortness_of_breath"])],
+     "message": "Possible cardiac event. Seek immediate care."},
+
+    {"stage": "symptoms",
+     "when": [("symptoms", "all", ["blood_in_sputum"])],
+     "message": "Coughing blood requires urgent evaluation."},
+
+    {"stage": "symptoms",
+     "when": [("symptoms", "all", ["high_fever", "chills", "fast_heart_rate", "altered_sensorium"])],
+     "message": "Possible severe infection."},
+
+    # Fever + confusion override
+    {"stage": "symptoms",
+     "when": [("symptoms", "all", ["high_fever", "altered_sensorium"])],
+     "message": "Fever with confusion may indicate severe infection."},
+
+    # Heart attack probability override
+    {"stage": "prediction",
+     "when": [("top_disease", "==", "Heart attack"), ("top_probability", ">", 0.40)],
+     "message": "High probability of cardiac event."},
+]
+
+
+def patient_context(age, bmi, smoker, family_history, symptoms, duration_weeks=0):
+    return {
+        "age": age,
+        "bmi": bmi,
+        "smoker": bool(smoker),
+        "family_history": bool(family_history),
+        "symptoms": set(symptoms),
+        "duration_weeks": duration_weeks,
+    }
+
+
+def condition_holds(condition, context):
+    field, op, value = condition
+    actual = context[field]
+
+    if op == ">=":
+        return actual >= value
+    if op == ">":
+        return actual > value
+    if op == "==":
+        return actual == value
+    if op == "all":
+        return all(symptom in actual for symptom in value)
+    if op == "any":
+        return any(symptom in actual for symptom in value)
+
+    raise ValueError(f"Unknown rule operator: {op}")
+
+
+def rule_holds(rule, context):
+    return all(condition_holds(condition, context) for condition in rule["when"])
+
+
+# Rule table compiled against the label encoder order: one multiplier vector
+# per boost rule, so a patient's boost is a product of a few vectors
+class ClinicalRuleEngine:
+
+    def __init__(self, label_classes, boost_rules=BOOST_RULES, emergency_rules=EMERGENCY_RULES):
+        self.label_classes = list(label_classes)
+        self.emergency_rules = emergency_rules
+        self.boost_rules = []
+
+        for rule in boost_rules:
+            vector = np.ones(len(self.label_classes))
+            for i, disease in enumerate(self.label_classes):
+                if disease in rule.get("diseases", ()) or (
+                    "disease_contains" in rule and rule["disease_contains"] in disease
+                ):
+                    vector[i] = rule["factor"]
+            self.boost_rules.append((rule, vector))
+
+    # (patients x diseases) multipliers for every rule of the given stages
+    def boost_matrix(self, contexts, stages=("profile", "evidence")):
+        boost = np.ones((len(contexts), len(self.label_classes)))
+
+        for rule, vector in self.boost_rules:
+            if rule["stage"] not in stages:
+                continue
+
+            mask = np.array([rule_holds(rule, context) for context in contexts], dtype=bool)
+            if mask.any():
+                boost *= np.where(mask[:, None], vector, 1.0)
+
+        return boost
+
+    def boost_vector(self, context, stages=("profile", "evidence")):
+        return self.boost_matrix([context], stages)[0]
+
+    # Reason for the first matching emergency rule, or None
+    def emergency_message(self, context, stages=("symptoms", "prediction")):
+        for rule in self.emergency_rules:
+            if rule["stage"] in stages and rule_holds(rule, context):
+                return rule["message"]
+        return None
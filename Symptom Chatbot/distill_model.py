@@ -0,0 +1,162 @@
+import argparse
+import json
+import time
+
+import numpy as np
+from scipy.optimize import minimize
+from linear_scorer import SCORER_PATH, LinearScorer, save_scorer
+from symptom_knowledge import canonical_symptom
+from symptom_model import MODEL_PATH, SymptomModel
+from training_data import TRAINING_CACHE_DIR, cached_training_split, generator_config
+
+REPORT_PATH = "symptom_linear_scorer_report.json"
+
+L2 = 1e-3 # Weight penalty, per patient
+MAX_ITERATIONS = 500
+SEED = 42
+
+# /chat scores a handful of confirmed symptoms, not full cohort rows, so every
+# patient is also seen with a random subset of its symptoms
+PARTIAL_COPIES = 2
+
+
+# Cohort rows plus copies keeping 1..n of each row's present symptoms
+def with_partial_evidence(x, rng, copies=PARTIAL_COPIES):
+    blocks = [x]
+    for _ in range(copies):
+        partial = np.zeros_like(x)
+        for r in range(len(x)):
+            present = np.flatnonzero(x[r])
+            if len(present):
+                keep = rng.choice(present, size=rng.integers(1, len(present) + 1), replace=False)
+                partial[r, keep] = 1
+        blocks.append(partial)
+    return np.vstack(blocks)
+
+
+# Multinomial logistic regression on the teacher's probabilities (soft
+# targets): minimizes cross-entropy + L2 / 2 * |W|^2 with L-BFGS.
+def fit_log_linear(x, teacher_probs, l2=L2, max_iterations=MAX_ITERATIONS):
+    n, n_features = x.shape
+    n_classes = teacher_probs.shape[1]
+
+    # Start from the teacher's average prediction
+    bias0 = np.log(np.clip(teacher_probs.mean(axis=0), 1e-9, None))
+    params0 = np.concatenate([np.zeros(n_features * n_classes), bias0])
+
+    def loss_and_grad(params):
+        weights = params[: n_features * n_classes].reshape(n_features, n_classes)
+        bias = params[n_features * n_classes:]
+
+        logits = x @ weights + bias
+        logits -= logits.max(axis=1, keepdims=True)
+        log_norm = np.log(np.exp(logits).sum(axis=1, keepdims=True))
+        log_probs = logits - log_norm
+
+        loss = -(teacher_probs * log_probs).sum() / n + 0.5 * l2 * (weights ** 2).sum()
+
+        residual = (np.exp(log_probs) - teacher_probs) / n
+        grad_weights = x.T @ residual + l2 * weights
+        grad_bias = residual.sum(axis=0)
+
+        return loss, np.concatenate([grad_weights.ravel(), grad_bias])
+
+    result = minimize(loss_and_grad, params0, jac=True, method="L-BFGS-B",
+                      options={"maxiter": max_iterations})
+
+    weights = result.x[: n_features * n_classes].reshape(n_features, n_classes)
+    bias = result.x[n_features * n_classes:]
+    # Stored (diseases x symptoms)
+    return weights.T, bias, result
+
+
+def agreement(teacher_probs, student_probs, y=None):
+    teacher_top1 = teacher_probs.argmax(axis=1)
+    student_top3 = np.argsort(-student_probs, axis=1)[:, :3]
+    teacher_top3 = np.argsort(-teacher_probs, axis=1)[:, :3]
+
+    report = {
+        "rows": len(teacher_probs),
+        # Same most likely disease
+        "top1_match": float((student_probs.argmax(axis=1) == teacher_top1).mean()),
+        # XGBoost's top disease is in the scorer's top 3
+        "top3_match": float((student_top3 == teacher_top1[:, None]).any(axis=1).mean()),
+        # Same three diseases, any order
+        "top3_set_match": float((np.sort(student_top3, axis=1) == np.sort(teacher_top3, axis=1)).all(axis=1).mean()),
+        "mean_abs_prob_diff": float(np.abs(student_probs - teacher_probs).mean()),
+    }
+    if y is not None:
+        report["teacher_accuracy"] = float((teacher_top1 == y).mean())
+        report["student_accuracy"] = float((student_probs.argmax(axis=1) == y).mean())
+    return report
+
+
+def time_per_request(model, requests):
+    start = time.perf_counter()
+    for indices in requests:
+        model.predict_one(indices)
+    return (time.perf_counter() - start) / len(requests) * 1e6
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Distill the symptom XGBoost model into a log-linear scorer.")
+    parser.add_argument("--l2", type=float, default=L2)
+    parser.add_argument("--max-iterations", type=int, default=MAX_ITERATIONS)
+    parser.add_argument("--partial-copies", type=int, default=PARTIAL_COPIES)
+    parser.add_argument("--cache-dir", default=TRAINING_CACHE_DIR)
+    parser.add_argument("--output", default=SCORER_PATH)
+    parser.add_argument("--report", default=REPORT_PATH)
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    rng = np.random.default_rng(SEED)
+
+    teacher = SymptomModel(MODEL_PATH, cache_size=0)
+    features = teacher.booster.feature_names
+
+    (x_train, x_test, y_train, y_test, labels), _ = cached_training_split(generator_config(), args.cache_dir)
+    if [canonical_symptom(f) for f in features] != x_train.columns.tolist():
+        raise RuntimeError(f"{MODEL_PATH} was not trained on the default synthetic cohort. Retrain or distill with matching settings.")
+
+    x_fit = with_partial_evidence(x_train.to_numpy(dtype=np.float64), rng, args.partial_copies)
+    start = time.perf_counter()
+    weights, bias, result = fit_log_linear(x_fit, teacher.predict_proba(x_fit), args.l2, args.max_iterations)
+    print(f"Fitted on {len(x_fit)} rows in {time.perf_counter() - start:.1f}s ({result.nit} iterations, loss {result.fun:.4f})")
+
+    save_scorer(weights, bias, features, MODEL_PATH, args.output)
+    student = LinearScorer(args.output, MODEL_PATH)
+
+    # Held-out cohort, and the same patients with partial evidence
+    x_eval = x_test.to_numpy(dtype=np.float64)
+    x_partial = with_partial_evidence(x_eval, rng, copies=1)[len(x_eval):]
+
+    requests = [np.flatnonzero(row).tolist() for row in x_partial[:500]]
+    report = {
+        "held_out": agreement(teacher.predict_proba(x_eval), student.predict_proba(x_eval), y_test.to_numpy()),
+        "partial_evidence": agreement(teacher.predict_proba(x_partial), student.predict_proba(x_partial), y_test.to_numpy()),
+        "latency_us": {
+            "xgboost": time_per_request(teacher, requests),
+            "linear": time_per_request(student, requests),
+        },
+        "size_bytes": {
+            "xgboost": len(teacher.booster.save_raw()),
+            "linear": int(weights.nbytes + bias.nbytes),
+        },
+    }
+
+    with open(args.report, "w") as f:
+        json.dump(report, f, indent=2)
+
+    for name in ("held_out", "partial_evidence"):
+        r = report[name]
+        print(f"{name:<17} top-1 {r['top1_match']:.3f}  top-3 {r['top3_match']:.3f}  "
+              f"accuracy xgboost {r['teacher_accuracy']:.3f} / linear {r['student_accuracy']:.3f}")
+    print(f"Per request: xgboost {report['latency_us']['xgboost']:.0f} us, linear {report['latency_us']['linear']:.0f} us")
+    print(f"Size: xgboost {report['size_bytes']['xgboost'] / 1e6:.1f} MB, linear {report['size_bytes']['linear'] / 1e3:.0f} KB")
+    print(f"Scorer saved to {args.output}, report to {args.report}. Serve it with SYMPTOM_MODEL_BACKEND=linear.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,221 @@
+import argparse
+import itertools
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import xgboost as xgb
+from model import EARLY_STOPPING_ROUNDS, MODEL_PARAMS
+from training_data import TRAINING_CACHE_DIR, cached_training_split, config_hash, generator_config
+
+# Values tried for each hyperparameter; model.MODEL_PARAMS fills the rest.
+# The default grid is 3 x 3 x 2 = 18 trials.
+SEARCH_SPACE = {
+    "max_depth": [3, 5, 7],
+    "learning_rate": [0.05, 0.1, 0.2],
+    "n_estimators": [200, 400],
+}
+
+# Wider space (19,440 grid points) for --space full; meant for --strategy
+# random or halving, not an exhaustive grid
+FULL_SEARCH_SPACE = {
+    "max_depth": [3, 4, 5, 6, 8],
+    "learning_rate": [0.03, 0.05, 0.1, 0.2],
+    "n_estimators": [100, 200, 400, 800],
+    "subsample": [0.6, 0.8, 1.0],
+    "colsample_bytree": [0.6, 0.8, 1.0],
+    "gamma": [0.0, 0.1, 0.5],
+    "reg_alpha": [0.0, 0.1, 1.0],
+    "reg_lambda": [0.5, 1.0, 2.0],
+}
+
+RESULTS_PATH = "hyperparameter_results.jsonl"
+
+LATENCY_ROWS = 200 # Single-row predictions timed per trial, as /chat calls the model
+HALVING_FACTOR = 3 # Successive halving keeps 1/3 of the trials per rung
+
+# sklearn-wrapper names that the native API spells differently
+NATIVE_NAMES = {"reg_alpha": "alpha", "reg_lambda": "lambda"}
+
+
+# ---------- Worker side ----------
+# Each worker process builds the DMatrix pair once and reuses it for every
+# trial it runs; nthread is pinned so workers x threads matches the cores.
+_worker = {}
+
+
+def init_worker(config, cache_dir, nthread):
+    (x_train, x_test, y_train, y_test, labels), _ = cached_training_split(config, cache_dir)
+
+    dtrain = xgb.QuantileDMatrix(x_train, label=y_train, nthread=nthread)
+    _worker.update(
+        dtrain=dtrain,
+        dtest=xgb.QuantileDMatrix(x_test, label=y_test, ref=dtrain, nthread=nthread),
+        x_test=x_test.to_numpy(dtype=np.float32),
+        y_test=y_test.to_numpy(),
+        num_class=len(labels.classes_),
+        nthread=nthread,
+    )
+
+
+def native_params(params):
+    native = {NATIVE_NAMES.get(k, k): v for k, v in params.items() if k != "n_estimators"}
+    native.update(num_class=_worker["num_class"], nthread=_worker["nthread"])
+    return native
+
+
+def run_trial(params):
+    evals_result = {}
+
+    start = time.perf_counter()
+    booster = xgb.train(
+        native_params(params),
+        _worker["dtrain"],
+        num_boost_round=params["n_estimators"],
+        evals=[(_worker["dtest"], "test")],
+        early_stopping_rounds=EARLY_STOPPING_ROUNDS,
+        evals_result=evals_result,
+        verbose_eval=False,
+    )
+    train_seconds = time.perf_counter() - start
+
+    best_iteration = booster.best_iteration
+    iteration_range = (0, best_iteration + 1)
+
+    probs = booster.inplace_predict(_worker["x_test"], iteration_range=iteration_range)
+    accuracy = float((probs.argmax(axis=1) == _worker["y_test"]).mean())
+
+    # Per-request latency: one dense row at a time on a single thread, as served
+    booster.set_param({"nthread": 1})
+    rows = _worker["x_test"][:LATENCY_ROWS]
+    start = time.perf_counter()
+    for i in range(len(rows)):
+        booster.inplace_predict(rows[i:i + 1], iteration_range=iteration_range)
+    latency_ms = (time.perf_counter() - start) / len(rows) * 1000
+
+    return {
+        "params": params,
+        "accuracy": accuracy,
+        "mlogloss": evals_result["test"]["mlogloss"][best_iteration],
+        "best_iteration": best_iteration,
+        "train_seconds": train_seconds,
+        "latency_ms": latency_ms,
+    }
+
+
+# ---------- Search strategies ----------
+def grid_trials(space):
+    keys = list(space)
+    return [dict(zip(keys, values)) for values in itertools.product(*(space[k] for k in keys))]
+
+
+def random_trials(space, n_trials, rng):
+    grid = grid_trials(space)
+    picks = rng.choice(len(grid), size=min(n_trials, len(grid)), replace=False)
+    return [grid[i] for i in picks]
+
+
+def with_defaults(trial):
+    params = {k: v for k, v in MODEL_PARAMS.items() if k not in ("objective", "eval_metric", "tree_method")}
+    params.update(trial)
+    return dict(params, objective=MODEL_PARAMS["objective"], eval_metric=MODEL_PARAMS["eval_metric"],
+                tree_method=MODEL_PARAMS["tree_method"])
+
+
+def run_all(executor, trials):
+    return list(executor.map(run_trial, trials))
+
+
+# Successive halving on boosting rounds: every candidate gets a small round
+# budget, the best 1/HALVING_FACTOR by mlogloss move on with HALVING_FACTOR
+# times the rounds, until one rung reaches max_rounds.
+def halving_search(executor, candidates, max_rounds, min_rounds):
+    results = []
+    rounds = min_rounds
+
+    while candidates:
+        rung = run_all(executor, [dict(trial, n_estimators=rounds) for trial in candidates])
+        results.extend(rung)
+
+        if rounds >= max_rounds or len(candidates) == 1:
+            break
+
+        rung.sort(key=lambda r: r["mlogloss"])
+        keep = max(1, len(rung) // HALVING_FACTOR)
+        candidates = [{k: v for k, v in r["params"].items() if k != "n_estimators"} for r in rung[:keep]]
+        rounds = min(rounds * HALVING_FACTOR, max_rounds)
+
+    return results
+
+
+# Configurations no other one beats on both accuracy and latency
+def speed_accuracy_frontier(results):
+    frontier = []
+    for result in sorted(results, key=lambda r: (r["latency_ms"], -r["accuracy"])):
+        if not frontier or result["accuracy"] > frontier[-1]["accuracy"]:
+            frontier.append(result)
+    return frontier
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Hyperparameter search for the symptom XGBoost model.")
+    parser.add_argument("--strategy", choices=["grid", "random", "halving"], default="grid")
+    parser.add_argument("--space", choices=["default", "full"], default="default",
+                        help="Search space: the small default grid or FULL_SEARCH_SPACE")
+    parser.add_argument("--trials", type=int, default=24, help="Configurations sampled for random/halving")
+    parser.add_argument("--nthread", type=int, default=1, help="XGBoost threads per worker")
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes (default: cores // nthread)")
+    parser.add_argument("--max-rounds", type=int, default=None, help="Halving: final round budget (default: largest n_estimators)")
+    parser.add_argument("--min-rounds", type=int, default=None, help="Halving: first round budget (default: smallest n_estimators)")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--cache-dir", default=TRAINING_CACHE_DIR)
+    parser.add_argument("--output", default=RESULTS_PATH)
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    rng = np.random.default_rng(args.seed)
+
+    workers = args.workers or max(1, (os.cpu_count() or 1) // args.nthread)
+    space = FULL_SEARCH_SPACE if args.space == "full" else SEARCH_SPACE
+
+    # Generate (or reuse) the split once here so workers only read the cache
+    config = generator_config()
+    cached_training_split(config, args.cache_dir)
+
+    if args.strategy == "grid":
+        trials = grid_trials(space)
+    else:
+        trials = random_trials(space, args.trials, rng)
+    trials = [with_defaults(trial) for trial in trials]
+
+    print(f"{args.strategy} over the {args.space} space: {len(trials)} configurations on dataset {config_hash(config)}, "
+          f"{workers} workers x {args.nthread} threads")
+
+    start = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=workers, initializer=init_worker,
+                             initargs=(config, args.cache_dir, args.nthread)) as executor:
+        if args.strategy == "halving":
+            results = halving_search(executor, trials, args.max_rounds or max(space["n_estimators"]),
+                                     args.min_rounds or min(space["n_estimators"]))
+        else:
+            results = run_all(executor, trials)
+    print(f"{len(results)} trials in {time.perf_counter() - start:.1f}s\n")
+
+    with open(args.output, "a") as f:
+        for result in results:
+            f.write(json.dumps(dict(result, dataset=config_hash(config), strategy=args.strategy)) + "\n")
+
+    print(f"{'accuracy':>8} {'mlogloss':>8} {'trees':>5} {'train s':>8} {'latency ms':>10}  params")
+    for result in speed_accuracy_frontier(results):
+        tuned = {k: v for k, v in result["params"].items() if k in space and k != "n_estimators"}
+        print(f"{result['accuracy']:>8.4f} {result['mlogloss']:>8.4f} {result['best_iteration'] + 1:>5} "
+              f"{result['train_seconds']:>8.1f} {result['latency_ms']:>10.3f}  {tuned}")
+    print(f"\nSpeed/accuracy frontier above; all trials appended to {args.output}.")
+
+
+if __name__ == "__main__":
+    main()
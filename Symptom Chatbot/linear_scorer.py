@@ -0,0 +1,82 @@
+import os
+
+import numpy as np
+from symptom_knowledge import ARTIFACT_PATH, canonical_symptom, file_sha256, load_knowledge
+
+SCORER_PATH = "symptom_linear_scorer.npz"
+MODEL_PATH = "disease_prediction_model.pkl"
+
+# Bump when the layout of the scorer file changes
+SCORER_VERSION = 1
+
+
+def softmax(logits):
+    logits = logits - logits.max(axis=-1, keepdims=True)
+    probs = np.exp(logits)
+    return probs / probs.sum(axis=-1, keepdims=True)
+
+
+# Log-linear stand-in for the XGBoost model, distilled from it by
+# distill_model.py: P(disease | symptoms) = softmax(bias + sum of the weight
+# columns of the present symptoms). Same interface as SymptomModel.
+class LinearScorer:
+
+    def __init__(self, path=SCORER_PATH, model_path=MODEL_PATH, knowledge_path=ARTIFACT_PATH):
+        if not os.path.exists(path):
+            raise RuntimeError(f"{path} not found. Run `python distill_model.py` to build it.")
+
+        with np.load(path, allow_pickle=False) as data:
+            version = int(data["version"])
+            if version != SCORER_VERSION:
+                raise RuntimeError(f"{path} has version {version}, expected {SCORER_VERSION}. Rebuild it.")
+
+            # (diseases x symptoms), columns in model feature order
+            self.weights = data["weights"]
+            self.bias = data["bias"]
+            self.features = data["features"].tolist()
+            teacher_sha256 = str(data["teacher_sha256"])
+
+        if os.path.exists(model_path) and file_sha256(model_path) != teacher_sha256:
+            raise RuntimeError(f"{path} was not distilled from the current {model_path}. Rebuild it.")
+
+        # Callers index columns by common_symptoms, so the order must match exactly
+        common_symptoms = load_knowledge(knowledge_path, model_path)["common_symptoms"]
+        if [canonical_symptom(f) for f in self.features] != common_symptoms:
+            raise RuntimeError(f"{path} features do not match the model features in {knowledge_path}. Rebuild it.")
+
+        self.n_features = self.weights.shape[1]
+
+        # Row per symptom, so a request sums a few contiguous rows
+        self._columns = np.ascontiguousarray(self.weights.T)
+
+    # Same output layout as SymptomModel.predict_proba on a dense 0/1 matrix
+    def predict_proba(self, x):
+        return softmax(np.asarray(x, dtype=np.float64) @ self._columns + self.bias)
+
+    # One probability row per list of present-symptom indices
+    def predict_indices(self, rows):
+        logits = np.tile(self.bias, (len(rows), 1))
+        for r, row in enumerate(rows):
+            present = sorted(set(int(i) for i in row))
+            if present:
+                logits[r] += self._columns[present].sum(axis=0)
+        return softmax(logits)
+
+    def predict_one(self, present_indices):
+        return self.predict_indices([present_indices])[0]
+
+    # No result cache: scoring is cheaper than a lookup
+    def cache_info(self):
+        return {"hits": 0, "misses": 0, "size": 0, "max_size": 0}
+
+
+def save_scorer(weights, bias, features, model_path=MODEL_PATH, path=SCORER_PATH):
+    np.savez(
+        path,
+        version=np.array(SCORER_VERSION),
+        weights=np.asarray(weights, dtype=np.float64),
+        bias=np.asarray(bias, dtype=np.float64),
+        features=np.array(features),
+        teacher_sha256=np.array(file_sha256(model_path)),
+    )
+    return path
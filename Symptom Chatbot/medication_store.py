@@ -0,0 +1,64 @@
+import re
+
+from disease_medications import DISEASE_MEDICATIONS
+
+
+# Label strings from the dataset carry stray whitespace ("Diabetes ",
+# "Paroymsal  Positional Vertigo"); compare them lower-cased and collapsed
+def normalize_label(name):
+    return re.sub(r"\s+", " ", name).strip().lower()
+
+
+# One in-memory view over DISEASE_MEDICATIONS. Diseases live in a list;
+# name and model-label lookups map to list positions.
+class MedicationStore:
+
+    def __init__(self, disease_medications=DISEASE_MEDICATIONS):
+        self.diseases = []
+        self.disease_index = {}
+
+        # Model label id -> disease id, filled by bind_labels()
+        self.label_index = []
+
+        for name, data in disease_medications.items():
+            key = normalize_label(name)
+            if key in self.disease_index:
+                raise ValueError(f"Duplicate medication entry after normalization: {name!r}")
+
+            self.disease_index[key] = len(self.diseases)
+            self.diseases.append({
+                "name": name,
+                "overview": data.get("overview", ""),
+                "medications": data.get("medications", []),
+            })
+
+    # Resolve every model class to a disease entry; fails on any gap
+    def bind_labels(self, label_classes):
+        label_index = []
+        missing = []
+
+        for label in label_classes:
+            disease_id = self.disease_index.get(normalize_label(label))
+            if disease_id is None:
+                missing.append(label)
+            label_index.append(disease_id)
+
+        if missing:
+            raise RuntimeError(f"No medication entry for model classes: {missing}")
+
+        self.label_index = label_index
+
+    # Disease id for a bound model class (no string handling)
+    def disease_id_for_label(self, label_id):
+        return self.label_index[label_id]
+
+    # Disease id for a free-form name, for callers without a label id
+    def disease_id(self, name):
+        return self.disease_index.get(normalize_label(name))
+
+    def disease(self, name):
+        disease_id = self.disease_id(name)
+        return None if disease_id is None else self.diseases[disease_id]
+
+
+medication_store = MedicationStore()
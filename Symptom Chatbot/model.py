@@ -1,29 +1,181 @@
+import argparse
+import os
+import sys
+import time
 from xgboost import XGBClassifier
 from sklearn.metrics import accuracy_score, classification_report
 import joblib as jb
-from all_symptoms import x_train, x_test, y_train, y_test, labels
-
-model = XGBClassifier(
-    objective="multi:softprob",
-    num_class=len(labels.classes_),
-    eval_metric="mlogloss",
-    max_depth=5,                # Increased depth carefully
-    learning_rate=0.05,         # Slower learning rate
-    n_estimators=400,           # More trees
-    subsample=0.8,              # Train on 80% of data per tree to prevent overfitting
-    colsample_bytree=0.8,       # Train on 80% of features per tree
-    gamma=0.1,                  # Relaxed min loss reduction
-    reg_alpha=0.1,              # L1 regularization
-    reg_lambda=1.0              # L2 regularization
+from training_data import (
+    CHUNK_SIZE,
+    SEED,
+    TRAINING_CACHE_DIR,
+    cached_training_split,
+    config_hash,
+    dropout_rate,
+    generator_config,
+    noise_rate,
+    samples_per_disease,
 )
+from symptom_knowledge import build_knowledge, ARTIFACT_PATH
 
-model.fit(x_train, y_train)
+try:
+    import resource
+except ImportError: # Windows
+    resource = None
 
-y_pred = model.predict(x_test)
-print("Accuracy:", accuracy_score(y_test, y_pred))
-print("\nClassification Report:\n", classification_report(y_test, y_pred, target_names=labels.classes_))
+MODEL_PATH = "disease_prediction_model.pkl"
+LABEL_ENCODER_PATH = "label_encoder.pkl"
 
-jb.dump(model, "disease_prediction_model.pkl")
-jb.dump(labels, "label_encoder.pkl")
+# Model, label encoder, feature order and the configs that produced them,
+# written together so they can never disagree
+BUNDLE_PATH = "symptom_model_bundle.pkl"
 
-print("Model saved.")
\ No newline at end of file
+MODEL_PARAMS = {
+    "objective": "multi:softprob",
+    "eval_metric": "mlogloss",
+    "tree_method": "hist",
+    "max_depth": 5,             # Increased depth carefully
+    "learning_rate": 0.05,      # Slower learning rate
+    "n_estimators": 400,        # Upper bound on trees; early stopping picks the count
+    "subsample": 0.8,           # Train on 80% of data per tree to prevent overfitting
+    "colsample_bytree": 0.8,    # Train on 80% of features per tree
+    "gamma": 0.1,               # Relaxed min loss reduction
+    "reg_alpha": 0.1,           # L1 regularization
+    "reg_lambda": 1.0,          # L2 regularization
+}
+
+# Rounds without a held-out mlogloss improvement before training stops
+EARLY_STOPPING_ROUNDS = 30
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Train the symptom XGBoost model.")
+    parser.add_argument("--samples-per-disease", type=int, default=samples_per_disease)
+    parser.add_argument("--noise-rate", type=float, default=noise_rate)
+    parser.add_argument("--dropout-rate", type=float, default=dropout_rate)
+    parser.add_argument("--seed", type=int, default=SEED)
+    parser.add_argument("--chunk-size", type=int, default=CHUNK_SIZE)
+    parser.add_argument("--n-estimators", type=int, default=MODEL_PARAMS["n_estimators"],
+                        help="Maximum boosting rounds (added rounds when warm-starting)")
+    parser.add_argument("--early-stopping-rounds", type=int, default=EARLY_STOPPING_ROUNDS)
+    parser.add_argument("--warm-start", action="store_true",
+                        help="Continue from the previous bundle if only the sample count changed")
+    parser.add_argument("--cache-dir", default=TRAINING_CACHE_DIR)
+    parser.add_argument("--no-cache", action="store_true", help="Regenerate the dataset even if cached")
+    parser.add_argument("--bundle", default=BUNDLE_PATH)
+    return parser.parse_args()
+
+
+# Peak resident memory of this process in MB, or None where unsupported
+def peak_memory_mb():
+    if resource is None:
+        return None
+
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # macOS reports bytes, Linux KB
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+# Trees the served model uses: with early stopping, up to the best round
+def best_booster(model):
+    booster = model.get_booster()
+    best = booster.attr("best_iteration")
+    return booster if best is None else booster[: int(best) + 1]
+
+
+# Booster to continue from, or None with the reason printed
+def warm_start_booster(path, config, features, classes):
+    if not os.path.exists(path):
+        print(f"Warm start skipped: {path} not found.")
+        return None
+
+    previous = jb.load(path)
+
+    # Only the sample count may differ; anything else changes what the trees mean
+    changed = sorted(k for k in config if k != "samples_per_disease" and previous["generator_config"].get(k) != config[k])
+    if changed:
+        print(f"Warm start skipped: generator settings changed ({', '.join(changed)}).")
+        return None
+    if previous["features"] != features or previous["classes"] != classes:
+        print("Warm start skipped: features or classes changed.")
+        return None
+
+    return best_booster(previous["model"])
+
+
+def save_bundle(bundle, path):
+    tmp_path = path + ".tmp"
+    jb.dump(bundle, tmp_path)
+    os.replace(tmp_path, path)
+
+
+def main():
+    args = parse_args()
+    start = time.perf_counter()
+
+    config = generator_config(args.samples_per_disease, args.noise_rate, args.dropout_rate, args.seed, args.chunk_size)
+    key = config_hash(config)
+
+    split, cached = cached_training_split(config, cache_dir=args.cache_dir, refresh=args.no_cache)
+    x_train, x_test, y_train, y_test, labels = split
+
+    data_seconds = time.perf_counter() - start
+    print(f"Dataset {key} ({'cached' if cached else 'generated'}): "
+          f"{len(x_train)} train / {len(x_test)} test rows, {x_train.shape[1]} symptoms, {data_seconds:.1f}s")
+
+    features = x_train.columns.tolist()
+    classes = [str(c) for c in labels.classes_]
+
+    previous = warm_start_booster(args.bundle, config, features, classes) if args.warm_start else None
+    if previous is not None:
+        print(f"Warm-starting from {previous.num_boosted_rounds()} trees in {args.bundle}.")
+
+    params = dict(MODEL_PARAMS, n_estimators=args.n_estimators)
+    model = XGBClassifier(
+        num_class=len(labels.classes_),
+        early_stopping_rounds=args.early_stopping_rounds,
+        **params
+    )
+
+    train_start = time.perf_counter()
+    model.fit(x_train, y_train, eval_set=[(x_test, y_test)], xgb_model=previous, verbose=False)
+    train_seconds = time.perf_counter() - train_start
+
+    # predict() already stops at the best round
+    y_pred = model.predict(x_test)
+    accuracy = accuracy_score(y_test, y_pred)
+    print("Accuracy:", accuracy)
+    print("\nClassification Report:\n", classification_report(y_test, y_pred, target_names=labels.classes_))
+
+    rounds = model.get_booster().num_boosted_rounds()
+    print(f"Trained {rounds} rounds, best {model.best_iteration + 1} "
+          f"(mlogloss {model.best_score:.4f}) in {train_seconds:.1f}s")
+
+    bundle = {
+        "model": model,
+        "labels": labels,
+        "features": features,
+        "classes": classes,
+        "symptom_index": {symptom: i for i, symptom in enumerate(features)},
+        "generator_config": config,
+        "config_hash": key,
+        "model_params": params,
+        "best_iteration": model.best_iteration,
+        "metrics": {"accuracy": accuracy, "mlogloss": model.best_score, "train_seconds": train_seconds},
+        "warm_started": previous is not None,
+    }
+    save_bundle(bundle, args.bundle)
+
+    # Files the serving code loads, exported from the same bundle
+    jb.dump(model, MODEL_PATH)
+    jb.dump(labels, LABEL_ENCODER_PATH)
+    build_knowledge(features, labels.classes_)
+    print(f"Bundle saved to {args.bundle}; {MODEL_PATH}, {LABEL_ENCODER_PATH} and {ARTIFACT_PATH} exported.")
+
+    peak = peak_memory_mb()
+    print(f"Total {time.perf_counter() - start:.1f}s, peak memory "
+          + (f"{peak:.0f} MB" if peak is not None else "n/a"))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,19 @@
+# Boost rules only look at age >= 60, BMI >= 30 and duration >= 3 weeks, so
+# patients inside the same buckets get the same probabilities and question
+AGE_BUCKET = 60
+BMI_BUCKET = 30
+DURATION_BUCKET_WEEKS = 3
+
+
+# Canonical evidence + profile bucket key for one /chat turn
+def prediction_key(confirmed, denied, profile, bmi, duration_weeks):
+    return (
+        tuple(sorted(confirmed)),
+        tuple(sorted(denied)),
+        profile.age >= AGE_BUCKET,
+        bmi >= BMI_BUCKET,
+        bool(profile.smoker),
+        bool(profile.family_history),
+        duration_weeks >= DURATION_BUCKET_WEEKS,
+        profile.gender.lower(),
+    )
@@ -0,0 +1,169 @@
+import hashlib
+import time
+
+import numpy as np
+from bayesian_engine import smooth_likelihoods, normalize
+from lru_cache import LRUCache
+from question_selector import (
+    DEFAULT_QUESTION_MODE,
+    MIN_INFORMATION_GAIN,
+    candidate_mask,
+    information_gain,
+    select_question,
+    xlogx,
+)
+
+# Same stopping rule as /chat and the CLI follow-up loop
+CONFIDENCE_MARGIN = 0.15
+
+# Expectimax objective: each question costs 1, states still unresolved at the
+# planning horizon cost UNRESOLVED_WEIGHT x their posterior entropy (nats)
+QUESTION_COST = 1.0
+UNRESOLVED_WEIGHT = 1.0
+
+PLANNER_DEPTH = 2
+PLANNER_TOP_K = 8 # Candidate questions expanded per node
+PLANNER_TIME_BUDGET = 0.02 # Seconds before falling back to the greedy choice
+
+
+class PlanningTimeout(Exception):
+    pass
+
+
+# Memoized expectimax values shared across sessions, keyed by the likelihood
+# table, top_k and root state plus yes/no evidence bitsets
+plan_cache = LRUCache(max_entries=50000)
+
+
+def is_confident(probs):
+    top2 = np.partition(probs, -2)[-2:]
+    return top2[1] - top2[0] >= CONFIDENCE_MARGIN
+
+
+def entropy(probs):
+    return -xlogx(probs).sum()
+
+
+def bitset(indices):
+    bits = 0
+    for i in indices:
+        bits |= 1 << int(i)
+    return bits
+
+
+class _Planner:
+
+    def __init__(self, likelihood, root_key, deadline, top_k):
+        self.likelihood = likelihood
+        self.root_key = root_key
+        self.deadline = deadline
+        self.top_k = top_k
+
+    # Returns (value, best symptom index or None) for a posterior state
+    def value(self, probs, mask, yes_bits, no_bits, depth):
+        key = (self.root_key, yes_bits, no_bits, depth)
+        cached = plan_cache.get(key)
+        if cached is not None:
+            return cached
+
+        if time.perf_counter() > self.deadline:
+            raise PlanningTimeout()
+
+        result = self._expand(probs, mask, yes_bits, no_bits, depth)
+        plan_cache.put(key, result)
+        return result
+
+    def _expand(self, probs, mask, yes_bits, no_bits, depth):
+        if is_confident(probs):
+            return 0.0, None
+
+        if depth == 0:
+            return -UNRESOLVED_WEIGHT * entropy(probs), None
+
+        gains = np.where(mask, information_gain(probs, self.likelihood), -np.inf)
+        greedy = int(np.argmax(gains))
+
+        if gains[greedy] < MIN_INFORMATION_GAIN:
+            return -UNRESOLVED_WEIGHT * entropy(probs), None
+
+        candidates = np.argsort(gains)[::-1][:self.top_k]
+        candidates = candidates[np.isfinite(gains[candidates])]
+
+        # Last question: score every candidate's answers in one matrix pass
+        if depth == 1:
+            values = -QUESTION_COST + self._leaf_values(probs, candidates)
+            best = int(np.argmax(values))
+            return values[best], int(candidates[best])
+
+        best_value, best_symptom = -np.inf, None
+
+        for symptom in candidates:
+            column = self.likelihood[:, symptom]
+            joint_yes = probs * column
+            joint_no = probs * (1 - column)
+            p_yes = joint_yes.sum()
+
+            child_mask = mask.copy()
+            child_mask[symptom] = False
+            bit = 1 << int(symptom)
+
+            expected = -QUESTION_COST
+            if p_yes > 0:
+                expected += p_yes * self.value(normalize(joint_yes), child_mask, yes_bits | bit, no_bits, depth - 1)[0]
+            if p_yes < 1:
+                expected += (1 - p_yes) * self.value(normalize(joint_no), child_mask, yes_bits, no_bits | bit, depth - 1)[0]
+
+            if expected > best_value:
+                best_value, best_symptom = expected, int(symptom)
+
+        return best_value, best_symptom
+
+    # Expected horizon value after asking each candidate (diseases x candidates)
+    def _leaf_values(self, probs, candidates):
+        columns = self.likelihood[:, candidates]
+        total = 0.0
+
+        for joint in (probs[:, None] * columns, probs[:, None] * (1 - columns)):
+            p_answer = joint.sum(axis=0)
+            children = joint / np.where(p_answer > 0, p_answer, 1)
+
+            top2 = np.partition(children, -2, axis=0)[-2:]
+            confident = top2[1] - top2[0] >= CONFIDENCE_MARGIN
+            child_entropy = -xlogx(children).sum(axis=0)
+
+            total = total + p_answer * np.where(confident, 0.0, -UNRESOLVED_WEIGHT * child_entropy)
+
+        return total
+
+
+# Lookahead question planning: expectimax over yes/no answers, `depth`
+# questions deep. Falls back to the greedy information-gain choice when the
+# time budget runs out.
+def plan_question(current_probs, prob_matrix, symptoms, asked_symptoms, gender,
+                  depth=PLANNER_DEPTH, time_budget=PLANNER_TIME_BUDGET, top_k=PLANNER_TOP_K):
+
+    probs = np.asarray(current_probs, dtype=np.float64)
+    mask = candidate_mask(symptoms, asked_symptoms, gender)
+
+    likelihood = smooth_likelihoods(prob_matrix)
+    likelihood_id = hashlib.blake2b(likelihood.tobytes(), digest_size=8).digest()
+
+    # Sessions that reach the same posterior with the same questions left share
+    # sub-trees, as long as they plan against the same table and top_k
+    root_key = (likelihood_id, top_k, np.round(probs, 6).tobytes(), bitset(np.flatnonzero(~mask)))
+
+    planner = _Planner(likelihood, root_key, time.perf_counter() + time_budget, top_k)
+
+    try:
+        _, best = planner.value(probs, mask, 0, 0, depth)
+    except PlanningTimeout:
+        return select_question(probs, prob_matrix, symptoms, asked_symptoms, gender, mode="information_gain")
+
+    return symptoms[best] if best is not None else None
+
+
+# Entry point for /chat and the CLI: mode is "planner" or a select_question mode
+def choose_question(current_probs, prob_matrix, symptoms, asked_symptoms, gender, mode=DEFAULT_QUESTION_MODE):
+    if mode == "planner":
+        return plan_question(current_probs, prob_matrix, symptoms, asked_symptoms, gender)
+    return select_question(current_probs, prob_matrix, symptoms, asked_symptoms, gender, mode=mode)
@@ -1,54 +1,90 @@
 import numpy as np
+from bayesian_engine import smooth_likelihoods
 
-def select_best_question(current_probs, disease_symptom_prob, labels, asked_symptoms, gender):
+# Symptoms never asked for a given gender
+GENDER_EXCLUDED_SYMPTOMS = {
+    "male": ["abnormal_menstruation"],
+    "female": ["prostate_pain"],
+}
+
+# Minimum usefulness thresholds
+MIN_VARIANCE = 0.05
+MIN_INFORMATION_GAIN = 0.01 # nats
+
+QUESTION_MODES = ("information_gain", "variance")
+
+# Best top-1 accuracy in benchmark_questions.py; the other modes are opt-in
+DEFAULT_QUESTION_MODE = "variance"
+
+
+def xlogx(values):
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.where(values > 0, values * np.log(values), 0.0)
+
+
+# Boolean mask of symptoms that may still be asked
+def candidate_mask(symptoms, asked_symptoms, gender):
+    excluded = set(asked_symptoms).union(GENDER_EXCLUDED_SYMPTOMS.get(gender, ()))
+    return np.array([symptom not in excluded for symptom in symptoms])
 
-    top_indices = np.argsort(current_probs)[-3:]
-    top_diseases = labels.classes_[top_indices]
 
-    best_symptom = None
-    max_variance = -1
+# Expected entropy reduction of the posterior for every symptom at once
+def information_gain(current_probs, likelihood):
+    current_probs = np.asarray(current_probs, dtype=np.float64)
 
-    # Get all symptoms from first top disease (structure reference)
-    all_symptoms = disease_symptom_prob[top_diseases[0]].index
+    joint_yes = current_probs[:, None] * likelihood
+    joint_no = current_probs[:, None] * (1 - likelihood)
 
-    for symptom in all_symptoms:
+    p_yes = joint_yes.sum(axis=0)
+    p_no = joint_no.sum(axis=0)
 
-        # Skip already asked
-        if symptom in asked_symptoms:
-            continue
+    prior_entropy = -xlogx(current_probs).sum()
+    joint_entropy = -(xlogx(joint_yes) + xlogx(joint_no)).sum(axis=0)
+    answer_entropy = -(xlogx(p_yes) + xlogx(p_no))
 
-    # Gender filter
-        if gender == "male" and symptom in ["abnormal_menstruation"]:
-            continue
+    # H(D) - H(D | answer), with H(D | answer) = H(D, answer) - H(answer)
+    return prior_entropy - (joint_entropy - answer_entropy)
 
-        if gender == "female" and symptom in ["prostate_pain"]:
-            continue
 
-        # Relevance filter
-        # Only consider symptom if it meaningfully appears in at least one top disease
-        relevant = False
-        for disease in top_diseases:
-            if disease_symptom_prob[disease][symptom] > 0.2:
-                relevant = True
-                break
+# Variance of P(symptom | disease) across the top-k diseases, restricted to
+# symptoms that meaningfully appear (> 0.2) in at least one of them
+def top_k_variance(current_probs, prob_matrix, top_k=3):
+    top_rows = prob_matrix[np.argsort(current_probs)[-top_k:]]
 
-        if not relevant:
-            continue
+    variance = np.var(top_rows, axis=0)
+    relevant = (top_rows > 0.2).any(axis=0)
 
-        # Compute variance across top diseases
-        values = [
-            disease_symptom_prob[disease][symptom]
-            for disease in top_diseases
-        ]
+    return np.where(relevant, variance, -1.0)
 
-        variance = np.var(values)
 
-        if variance > max_variance:
-            max_variance = variance
-            best_symptom = symptom
+# Pick the next follow-up question over the whole (diseases x symptoms) matrix.
+# mode="variance" is the original top-k variance heuristic (the default);
+# mode="information_gain" scores the full posterior.
+def select_question(current_probs, prob_matrix, symptoms, asked_symptoms, gender,
+                    mode=DEFAULT_QUESTION_MODE, top_k=3):
 
-    # Minimum usefulness threshold
-    if max_variance < 0.05:
+    mask = candidate_mask(symptoms, asked_symptoms, gender)
+
+    if mode == "information_gain":
+        scores = information_gain(current_probs, smooth_likelihoods(prob_matrix))
+        min_score = MIN_INFORMATION_GAIN
+    elif mode == "variance":
+        scores = top_k_variance(current_probs, prob_matrix, top_k)
+        min_score = MIN_VARIANCE
+    else:
+        raise ValueError(f"Unknown question mode: {mode}. Expected one of {QUESTION_MODES}.")
+
+    scores = np.where(mask, scores, -np.inf)
+    best = int(np.argmax(scores))
+
+    if scores[best] < min_score:
         return None
 
-    return best_symptom
\ No newline at end of file
+    return symptoms[best]
+
+
+def select_best_question(current_probs, disease_symptom_prob, labels, asked_symptoms, gender):
+    prob_matrix = np.vstack([disease_symptom_prob[disease].to_numpy() for disease in labels.classes_])
+    symptoms = list(disease_symptom_prob[labels.classes_[0]].index)
+
+    return select_question(current_probs, prob_matrix, symptoms, asked_symptoms, gender, mode="variance")
@@ -0,0 +1,68 @@
+import threading
+import time
+import uuid
+from collections import OrderedDict
+
+
+# Bounded in-memory store for /chat sessions (TTL + LRU eviction)
+class SessionStore:
+
+    def __init__(self, max_sessions=10000, ttl_seconds=1800):
+        self.max_sessions = max_sessions
+        self.ttl_seconds = ttl_seconds
+        self._sessions = OrderedDict()
+        self._lock = threading.Lock()
+
+    def create(self):
+        session = {
+            "session_id": uuid.uuid4().hex,
+            "confirmed": set(),
+            "denied": set(),
+            # Raw Bayesian posterior (before smoothing and boosts)
+            "posterior": None,
+            "profile": None,
+            "boost": None,
+            "duration_weeks": 0,
+            # Held by the caller for the whole of a turn that reads and updates the session
+            "lock": threading.Lock(),
+        }
+
+        with self._lock:
+            now = time.monotonic()
+            self._sessions[session["session_id"]] = (session, now)
+            self._evict(now)
+
+        return session
+
+    def get(self, session_id):
+        with self._lock:
+            entry = self._sessions.get(session_id)
+            if entry is None:
+                return None
+
+            session, last_used = entry
+            now = time.monotonic()
+
+            if now - last_used > self.ttl_seconds:
+                del self._sessions[session_id]
+                return None
+
+            # Most recently used goes to the end
+            self._sessions[session_id] = (session, now)
+            self._sessions.move_to_end(session_id)
+            return session
+
+    def delete(self, session_id):
+        with self._lock:
+            self._sessions.pop(session_id, None)
+
+    def __len__(self):
+        return len(self._sessions)
+
+    def _evict(self, now):
+        # Oldest entries sit at the front
+        while self._sessions:
+            session_id, (_, last_used) = next(iter(self._sessions.items()))
+            if len(self._sessions) <= self.max_sessions and now - last_used <= self.ttl_seconds:
+                break
+            del self._sessions[session_id]
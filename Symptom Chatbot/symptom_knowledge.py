@@ -0,0 +1,204 @@
+import hashlib
+import os
+import re
+import numpy as np
+import pandas as pd
+from scipy import sparse
+
+DATASET_PATH = "DiseaseAndSymptoms.csv"
+MODEL_PATH = "disease_prediction_model.pkl"
+ARTIFACT_PATH = "symptom_knowledge.npz"
+
+# Bump when the layout of the artifact changes
+ARTIFACT_VERSION = 2 # 2: canonical symptom names
+
+ARRAY_KEYS = ["symptoms", "diseases", "disease_symptom_prob", "common_idx", "model_sha256"]
+
+
+# Symptom names as the dataset should have spelled them: stray spaces
+# ("dischromic _patches", "foul_smell_of urine") become underscores
+def canonical_symptom(name):
+    return re.sub(r"[\s_]+", "_", name.strip())
+
+
+# Parse the dataset into a sparse (rows x symptoms) 0/1 matrix in one pass.
+# Columns are read as categoricals, so each distinct name is canonicalized
+# once and every cell is just a code lookup.
+def load_symptom_csr(path=DATASET_PATH):
+    df = pd.read_csv(path, dtype="category")
+    columns = [df[col].cat for col in df.columns[1:]]
+
+    names = set()
+    for col in columns:
+        names.update(canonical_symptom(name) for name in col.categories)
+    symptoms = sorted(names)
+    symptom_index = {name: i for i, name in enumerate(symptoms)}
+
+    rows, cols = [], []
+    for col in columns:
+        codes = col.codes.to_numpy()
+        present = np.flatnonzero(codes >= 0) # -1 is an empty cell
+        lookup = np.array([symptom_index[canonical_symptom(name)] for name in col.categories], dtype=np.int32)
+
+        rows.append(present)
+        cols.append(lookup[codes[present]])
+
+    rows = np.concatenate(rows)
+    cols = np.concatenate(cols)
+
+    matrix = sparse.csr_matrix(
+        (np.ones(len(rows), dtype=np.uint8), (rows, cols)),
+        shape=(len(df), len(symptoms)),
+    )
+    # A symptom listed twice for one patient still counts once
+    matrix.sum_duplicates()
+    matrix.data[:] = 1
+
+    disease_codes, diseases = pd.factorize(df["Disease"].astype(str), sort=True)
+
+    return {
+        "matrix": matrix,
+        "symptoms": symptoms,
+        "diseases": diseases.tolist(),
+        "disease_codes": disease_codes,
+    }
+
+
+# Dense binary symptom matrix with a Disease column, for inspection and pandas use
+def load_symptom_matrix(path=DATASET_PATH):
+    data = load_symptom_csr(path)
+
+    binary_df = pd.DataFrame(data["matrix"].toarray(), columns=data["symptoms"])
+    binary_df["Disease"] = np.asarray(data["diseases"], dtype=object)[data["disease_codes"]]
+    return binary_df
+
+
+# Conditional probabilities P(symptom | disease) as a (diseases x symptoms)
+# matrix, rows in `data["diseases"]` order. The groupby is one sparse
+# product: a (diseases x rows) indicator times the symptom matrix.
+def symptom_prob_matrix(data):
+    codes = data["disease_codes"]
+    n_diseases = len(data["diseases"])
+
+    membership = sparse.csr_matrix(
+        (np.ones(len(codes), dtype=np.int64), (codes, np.arange(len(codes)))),
+        shape=(n_diseases, len(codes)),
+    )
+    counts = (membership @ data["matrix"].astype(np.int64)).toarray()
+    patients = np.bincount(codes, minlength=n_diseases)
+
+    return counts / patients[:, None]
+
+
+# ... and as one Series per disease
+def compute_disease_symptom_prob(data):
+    matrix = symptom_prob_matrix(data)
+
+    return {
+        disease: pd.Series(matrix[i], index=data["symptoms"])
+        for i, disease in enumerate(data["diseases"])
+    }
+
+
+def file_sha256(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _checksum(arrays):
+    digest = hashlib.sha256(str(ARTIFACT_VERSION).encode())
+    for key in ARRAY_KEYS:
+        arr = np.ascontiguousarray(arrays[key])
+        digest.update(key.encode())
+        digest.update(str(arr.dtype).encode())
+        digest.update(str(arr.shape).encode())
+        digest.update(arr.tobytes())
+    return digest.hexdigest()
+
+
+# Build step: run after training (model.py does this) or against an existing model
+def build_knowledge(common_symptoms, label_classes, model_path=MODEL_PATH,
+                    dataset_path=DATASET_PATH, path=ARTIFACT_PATH):
+    disease_symptom_prob = compute_disease_symptom_prob(load_symptom_csr(dataset_path))
+
+    label_classes = [str(d) for d in label_classes]
+    if sorted(disease_symptom_prob) != sorted(label_classes):
+        raise RuntimeError("Label classes do not match the diseases in " + dataset_path)
+
+    symptoms = list(disease_symptom_prob[label_classes[0]].index)
+
+    # Models trained before names were canonicalized carry the raw spellings
+    common_symptoms = [canonical_symptom(s) for s in common_symptoms]
+    missing = [s for s in common_symptoms if s not in symptoms]
+    if missing:
+        raise RuntimeError(f"Model features not found in {dataset_path}: {missing}")
+
+    symptom_index = {s: i for i, s in enumerate(symptoms)}
+
+    arrays = {
+        "symptoms": np.array(symptoms),
+        "diseases": np.array(label_classes),
+        # Rows follow the label encoder order, columns follow `symptoms`
+        "disease_symptom_prob": np.vstack(
+            [disease_symptom_prob[d][symptoms].to_numpy(dtype=np.float64) for d in label_classes]
+        ),
+        # Column order the model was trained on
+        "common_idx": np.array([symptom_index[s] for s in common_symptoms], dtype=np.int32),
+        "model_sha256": np.array(file_sha256(model_path)),
+    }
+
+    np.savez(
+        path,
+        version=np.array(ARTIFACT_VERSION),
+        checksum=np.array(_checksum(arrays)),
+        **arrays
+    )
+    return path
+
+
+# Load precompiled artifact, failing fast on corruption or a model mismatch
+def load_knowledge(path=ARTIFACT_PATH, model_path=MODEL_PATH):
+    if not os.path.exists(path):
+        raise RuntimeError(
+            f"{path} not found. Run `python symptom_knowledge.py` (or retrain with model.py) to build it."
+        )
+
+    with np.load(path, allow_pickle=False) as data:
+        version = int(data["version"])
+        if version != ARTIFACT_VERSION:
+            raise RuntimeError(f"{path} has version {version}, expected {ARTIFACT_VERSION}. Rebuild it.")
+
+        arrays = {key: data[key] for key in ARRAY_KEYS}
+
+        if str(data["checksum"]) != _checksum(arrays):
+            raise RuntimeError(f"{path} failed checksum verification. Rebuild it.")
+
+    if os.path.exists(model_path) and file_sha256(model_path) != str(arrays["model_sha256"]):
+        raise RuntimeError(f"{path} was not built for the current {model_path}. Rebuild it.")
+
+    symptoms = arrays["symptoms"].tolist()
+
+    return {
+        "symptoms": symptoms,
+        "diseases": arrays["diseases"].tolist(),
+        "disease_symptom_prob": arrays["disease_symptom_prob"],
+        "common_symptoms": [symptoms[i] for i in arrays["common_idx"]],
+    }
+
+
+def check_label_encoder(labels, label_classes):
+    if list(labels.classes_) != list(label_classes):
+        raise RuntimeError(f"label_encoder.pkl does not match {ARTIFACT_PATH}. Rebuild it.")
+
+
+if __name__ == "__main__":
+    import joblib as jb
+
+    model = jb.load(MODEL_PATH)
+    labels = jb.load("label_encoder.pkl")
+
+    build_knowledge(model.get_booster().feature_names, labels.classes_)
+    print(f"Knowledge artifact saved to {ARTIFACT_PATH}.")
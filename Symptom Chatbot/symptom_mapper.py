@@ -1,10 +1,19 @@
 import re
+import time
 import difflib
+from bisect import bisect_right
+from collections import Counter
 from all_symptoms import common_symptoms
 
 # Negation words
 NEGATIONS = {"no", "not", "dont", "without", "never", "none"}
 
+# Fuzzy matching settings
+FUZZY_THRESHOLD = 0.90
+FUZZY_MIN_LENGTH = 8 # Shorter phrases are too easy to hit by accident
+FUZZY_TIME_BUDGET = 0.005 # Seconds of fuzzy matching allowed per message
+FUZZY_MIN_DICE = 0.5 # Trigram overlap needed before running SequenceMatcher
+
 # Synonym map for common phrases to standardized symptoms
 SYNONYM_MAP = {
     # Vertigo / Dizziness
@@ -42,40 +51,60 @@ def clean_text(text):
     return text
 
 # Synonym Normalization
+# One compiled scan decides whether any synonym is present at all; replacements
+# stay sequential because one replacement can create or break another phrase
+SYNONYM_REGEX = re.compile("|".join(re.escape(phrase) for phrase in SYNONYM_MAP))
+
 def normalize_synonyms(text):
+    if not SYNONYM_REGEX.search(text):
+        return text
+
     for phrase, replacement in SYNONYM_MAP.items():
         if phrase in text:
             text = text.replace(phrase, replacement.replace("_", " "))
     return text
 
 # Negation Detection
-def is_negated(text, match_start):
+# Word positions assume single-space separators, as the original splitter did
+def tokenize(text):
     words = text.split()
-    char_positions = []
+    starts = []
+    negation_counts = [0]
     pos = 0
 
     for word in words:
-        char_positions.append((word, pos))
+        starts.append(pos)
         pos += len(word) + 1
+        negation_counts.append(negation_counts[-1] + (word in NEGATIONS))
+
+    return words, starts, negation_counts
 
-    word_index = None
-    for i, (word, position) in enumerate(char_positions):
-        if position <= match_start < position + len(word):
-            word_index = i
-            break
+def is_negated_at(tokens, match_start):
+    words, starts, negation_counts = tokens
 
-    if word_index is None:
+    word_index = bisect_right(starts, match_start) - 1
+    if word_index < 0 or match_start >= starts[word_index] + len(words[word_index]):
         return False
 
     window_start = max(0, word_index - 4)
-    context_words = words[window_start:word_index]
+    return negation_counts[word_index] - negation_counts[window_start] > 0
 
-    return any(w in NEGATIONS for w in context_words)
+def is_negated(text, match_start):
+    return is_negated_at(tokenize(text), match_start)
 
 # Controlled Fuzzy Matching for Phrases
-def fuzzy_phrase_match(text, phrase, threshold=0.90):
-    similarity = difflib.SequenceMatcher(None, text, phrase).ratio()
-    return similarity >= threshold
+def fuzzy_phrase_match(text, phrase, threshold=FUZZY_THRESHOLD):
+    matcher = difflib.SequenceMatcher(None, text, phrase)
+    # Cheap upper bounds first; ratio() is only computed when they pass
+    return (
+        matcher.real_quick_ratio() >= threshold
+        and matcher.quick_ratio() >= threshold
+        and matcher.ratio() >= threshold
+    )
+
+def char_trigrams(text):
+    padded = f" {text} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
 
 # Semantic Patterns for Common Symptoms
 SYMPTOM_PATTERNS = {
@@ -232,6 +261,122 @@ SYMPTOM_PATTERNS = {
     ],
 }
 
+# Precompiled semantic patterns for symptoms the model knows
+COMPILED_PATTERNS = [
+    (symptom, [re.compile(pattern) for pattern in patterns])
+    for symptom, patterns in SYMPTOM_PATTERNS.items()
+    if symptom in common_symptoms
+]
+
+# Dataset phrase trie over words: {word: {word: ...}}, with the symptom and the
+# exact separators between words stored under None at the end of each phrase.
+# Phrases containing characters clean_text removes can never match and are skipped.
+def build_phrase_trie(symptoms):
+    trie = {}
+
+    for symptom in symptoms:
+        phrase = symptom.replace("_", " ")
+        if not re.fullmatch(r"[a-z]+(?:\s+[a-z]+)*", phrase):
+            continue
+
+        words = re.findall(r"[a-z]+", phrase)
+        separators = tuple(re.findall(r"\s+", phrase))
+
+        node = trie
+        for word in words:
+            node = node.setdefault(word, {})
+        node.setdefault(None, []).append((symptom, separators))
+
+    return trie
+
+PHRASE_TRIE = build_phrase_trie(common_symptoms)
+
+# Phrases long enough for the fuzzy fallback, with a trigram -> phrase index
+FUZZY_PHRASES = []
+TRIGRAM_INDEX = {}
+
+for symptom in common_symptoms:
+    phrase = symptom.replace("_", " ")
+    if len(phrase) < FUZZY_MIN_LENGTH:
+        continue
+
+    grams = char_trigrams(phrase)
+    for gram in grams:
+        TRIGRAM_INDEX.setdefault(gram, []).append(len(FUZZY_PHRASES))
+    FUZZY_PHRASES.append((symptom, phrase, len(phrase.split()), len(grams)))
+
+MAX_FUZZY_WORDS = max((n_words for _, _, n_words, _ in FUZZY_PHRASES), default=0)
+
+# Fuzzy fallback over word windows whose length is within one word of the
+# phrase. The trigram index shortlists phrases before any edit-distance
+# scoring, and the whole pass stops once the time budget is spent.
+def fuzzy_matches(tokens, exclude=(), threshold=FUZZY_THRESHOLD, time_budget=FUZZY_TIME_BUDGET):
+    words, starts, _ = tokens
+    deadline = time.perf_counter() + time_budget
+    found = set()
+    seen_windows = set()
+
+    for size in range(1, MAX_FUZZY_WORDS + 2):
+        for i in range(len(words) - size + 1):
+
+            # "no abdominal pain" would fuzzy-match the phrase while its own
+            # negation sits outside the look-back; the window without the
+            # negation word is scored (and found negated) instead
+            if words[i] in NEGATIONS:
+                continue
+
+            window = " ".join(words[i:i + size])
+            if window in seen_windows:
+                continue
+            seen_windows.add(window)
+
+            window_grams = char_trigrams(window)
+            shared = Counter(
+                phrase_id
+                for gram in window_grams
+                for phrase_id in TRIGRAM_INDEX.get(gram, ())
+            )
+
+            for phrase_id, count in shared.items():
+                symptom, phrase, n_words, n_grams = FUZZY_PHRASES[phrase_id]
+
+                if symptom in found or symptom in exclude or abs(n_words - size) > 1:
+                    continue
+
+                if 2 * count < FUZZY_MIN_DICE * (n_grams + len(window_grams)):
+                    continue
+
+                if time.perf_counter() > deadline:
+                    return found
+
+                if fuzzy_phrase_match(window, phrase, threshold) and not is_negated_at(tokens, starts[i]):
+                    found.add(symptom)
+
+    return found
+
+# Leftmost start of every dataset phrase found on word boundaries
+def find_phrases(text):
+    spans = [(m.start(), m.end()) for m in re.finditer(r"[a-z]+", text)]
+    words = [text[start:end] for start, end in spans]
+    found = {}
+
+    for i in range(len(words)):
+        node = PHRASE_TRIE
+        j = i
+
+        while j < len(words) and words[j] in node:
+            node = node[words[j]]
+            j += 1
+
+            for symptom, separators in node.get(None, ()):
+                if symptom in found:
+                    continue
+                # Gaps between matched words must equal the phrase's separators
+                if all(text[spans[k][1]:spans[k + 1][0]] == separators[k - i] for k in range(i, j - 1)):
+                    found[symptom] = spans[i][0]
+
+    return found
+
 # Main Extraction Function
 def extract_symptoms_from_text(user_input):
 
@@ -240,35 +385,24 @@ def extract_symptoms_from_text(user_input):
     # Synonym normalization layer
     text = normalize_synonyms(text)
 
+    # Tokenized once and shared by every negation check
+    tokens = tokenize(text)
+
     detected = set()
 
     # Regex Semantic Matching
-    for symptom, patterns in SYMPTOM_PATTERNS.items():
-
-        if symptom not in common_symptoms:
-            continue
-
+    for symptom, patterns in COMPILED_PATTERNS:
         for pattern in patterns:
-            match = re.search(pattern, text)
-            if match and not is_negated(text, match.start()):
+            match = pattern.search(text)
+            if match and not is_negated_at(tokens, match.start()):
                 detected.add(symptom)
                 break
 
     # Dataset Phrase Fallback
-    for symptom in common_symptoms:
-
-        if symptom in detected:
-            continue
-
-        phrase = symptom.replace("_", " ")
-
-        match = re.search(r"\b" + re.escape(phrase) + r"\b", text)
-        if match and not is_negated(text, match.start()):
+    for symptom, match_start in find_phrases(text).items():
+        if not is_negated_at(tokens, match_start):
             detected.add(symptom)
-            continue
 
-        if len(phrase) >= 8:
-            if fuzzy_phrase_match(text, phrase):
-                detected.add(symptom)
+    detected |= fuzzy_matches(tokens, exclude=detected)
 
-    return detected
\ No newline at end of file
+    return detected
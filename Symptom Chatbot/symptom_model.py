@@ -0,0 +1,105 @@
+import os
+import threading
+from collections import OrderedDict
+
+import joblib as jb
+import numpy as np
+
+MODEL_PATH = "disease_prediction_model.pkl"
+
+# Threads per worker process. Under several uvicorn workers the XGBoost
+# default (all cores per call) oversubscribes the machine.
+DEFAULT_NTHREAD = int(os.environ.get("SYMPTOM_MODEL_NTHREAD", "1"))
+
+# Cached probability vectors keyed by the confirmed-symptom set (0 disables)
+DEFAULT_CACHE_SIZE = int(os.environ.get("SYMPTOM_MODEL_CACHE_SIZE", "4096"))
+
+# "xgboost" serves the booster; "linear" the scorer distilled from it (distill_model.py)
+DEFAULT_BACKEND = os.environ.get("SYMPTOM_MODEL_BACKEND", "xgboost")
+
+
+# Direct booster inference for the symptom XGBoost model.
+#
+# Inputs are the column indices (into common_symptoms) of present symptoms.
+# Rows are still fed to the booster dense: the model was trained on explicit
+# zeros, and a CSR row would turn every absent symptom into a missing value.
+class SymptomModel:
+
+    def __init__(self, path=MODEL_PATH, nthread=DEFAULT_NTHREAD, cache_size=DEFAULT_CACHE_SIZE):
+        self.classifier = jb.load(path)
+        self.booster = self.classifier.get_booster()
+        self.booster.set_param({"nthread": nthread})
+
+        # Early-stopped models keep the rounds after the best one; predict only up to it
+        best = self.booster.attr("best_iteration")
+        self.iteration_range = (0, int(best) + 1) if best is not None else (0, 0)
+
+        self.n_features = self.booster.num_features()
+        self.cache_size = cache_size
+        self.hits = 0
+        self.misses = 0
+        self._cache = OrderedDict()
+        self._lock = threading.Lock()
+
+    # Same output as classifier.predict_proba on a dense matrix
+    def predict_proba(self, x):
+        return self.booster.inplace_predict(np.asarray(x, dtype=np.float32), iteration_range=self.iteration_range)
+
+    # One probability row per list of present-symptom indices
+    def predict_indices(self, rows):
+        keys = [tuple(sorted(set(int(i) for i in row))) for row in rows]
+        probs = [self._cache_get(key) for key in keys]
+
+        missing = [r for r, p in enumerate(probs) if p is None]
+        if missing:
+            x = np.zeros((len(missing), self.n_features), dtype=np.float32)
+            for r, row in enumerate(missing):
+                x[r, list(keys[row])] = 1
+
+            predicted = self.booster.inplace_predict(x, iteration_range=self.iteration_range)
+            for r, row in enumerate(missing):
+                probs[row] = predicted[r]
+                self._cache_put(keys[row], predicted[r])
+
+        return np.vstack(probs).astype(np.float64)
+
+    def predict_one(self, present_indices):
+        return self.predict_indices([present_indices])[0]
+
+    def cache_info(self):
+        return {"hits": self.hits, "misses": self.misses, "size": len(self._cache), "max_size": self.cache_size}
+
+    def _cache_get(self, key):
+        if not self.cache_size:
+            return None
+
+        with self._lock:
+            probs = self._cache.get(key)
+            if probs is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self._cache.move_to_end(key)
+            return probs
+
+    def _cache_put(self, key, probs):
+        if not self.cache_size:
+            return
+
+        with self._lock:
+            # Stored read-only so callers cannot mutate a shared vector
+            probs = probs.copy()
+            probs.flags.writeable = False
+            self._cache[key] = probs
+            self._cache.move_to_end(key)
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+
+
+def load_symptom_model(path=MODEL_PATH, backend=DEFAULT_BACKEND):
+    if backend == "xgboost":
+        return SymptomModel(path)
+    if backend == "linear":
+        from linear_scorer import LinearScorer
+        return LinearScorer(model_path=path)
+    raise ValueError(f"Unknown SYMPTOM_MODEL_BACKEND {backend!r}; expected 'xgboost' or 'linear'")
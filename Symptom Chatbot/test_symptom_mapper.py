@@ -0,0 +1,19 @@
+import pytest
+from symptom_mapper import extract_symptoms_from_text
+
+# Negated phrases must not come back from the fuzzy window fallback
+NEGATION_CASES = [
+    ("I have no abdominal pain, just a cough", {"cough"}),
+    ("no loss of appetite, only headache", {"headache"}),
+    ("there is no muscle weakness but I have a headache", {"headache"}),
+    ("no yellowish skin at all, but I do feel dizzy", set()),
+]
+
+
+@pytest.mark.parametrize("text, expected", NEGATION_CASES)
+def test_negated_phrases_are_not_detected(text, expected):
+    assert extract_symptoms_from_text(text) == expected
+
+
+def test_unnegated_phrases_are_detected():
+    assert extract_symptoms_from_text("I have abdominal pain and loss of appetite") == {"abdominal_pain", "loss_of_appetite"}
@@ -0,0 +1,164 @@
+import hashlib
+import json
+import os
+import pandas as pd
+import numpy as np
+from sklearn.preprocessing import LabelEncoder
+from sklearn.model_selection import train_test_split
+from symptom_knowledge import DATASET_PATH, file_sha256, load_symptom_csr, compute_disease_symptom_prob
+
+# Generate synthetic patients (added noise and dropout to prevent overfitting)
+samples_per_disease = 400
+noise_rate = 0.08 # Reduced from 0.15 to prevent severe underfitting
+dropout_rate = 0.10 # Reduced from 0.20
+
+# Same seed and chunk size give the same cohort on every run and every machine
+SEED = 42
+CHUNK_SIZE = 50000 # Patients drawn per step; bounds generator memory
+
+MIN_SYMPTOM_COUNT = 500 # Symptoms seen fewer times in the cohort are dropped
+TEST_SIZE = 0.2
+
+# Generated splits are cached here, one file per generator config
+TRAINING_CACHE_DIR = os.environ.get("TRAINING_CACHE_DIR", "training_cache")
+
+# Bump when generation or the split changes in a way the config does not capture
+GENERATOR_VERSION = 1
+
+
+# One vectorized draw for a block of patients. row_probs holds each
+# patient's P(symptom | disease) row.
+def sample_patients(row_probs, rng, noise_rate=noise_rate, dropout_rate=dropout_rate):
+    shape = row_probs.shape
+
+    values = rng.random(shape, dtype=np.float32) < row_probs
+
+    # Symptoms flipped at random
+    values ^= rng.random(shape, dtype=np.float32) < noise_rate
+
+    # Simulate patient forgetting to mention a symptom
+    values &= rng.random(shape, dtype=np.float32) >= dropout_rate
+
+    return values.view(np.uint8)
+
+
+# Streams a cohort of `samples_per_disease` patients per disease (grouped by
+# disease, like the full cohort) as (uint8 symptom matrix, disease index)
+# chunks. Chunk i has its own seeded stream, so any chunk can be regenerated
+# on its own and memory stays at one chunk however large the cohort is.
+def iter_synthetic_chunks(prob_matrix, samples_per_disease=samples_per_disease, chunk_size=CHUNK_SIZE,
+                          seed=SEED, noise_rate=noise_rate, dropout_rate=dropout_rate):
+    prob_matrix = np.asarray(prob_matrix, dtype=np.float32)
+    total = prob_matrix.shape[0] * samples_per_disease
+
+    for chunk, start in enumerate(range(0, total, chunk_size)):
+        rng = np.random.default_rng(np.random.SeedSequence(seed, spawn_key=(chunk,)))
+        disease_idx = np.arange(start, min(start + chunk_size, total)) // samples_per_disease
+
+        yield sample_patients(prob_matrix[disease_idx], rng, noise_rate, dropout_rate), disease_idx
+
+
+def generate_synthetic_patients(disease_symptom_prob, symptoms, samples_per_disease=samples_per_disease,
+                                seed=SEED, chunk_size=CHUNK_SIZE, noise_rate=noise_rate, dropout_rate=dropout_rate):
+    diseases = list(disease_symptom_prob)
+    prob_matrix = np.vstack([disease_symptom_prob[disease][symptoms].to_numpy() for disease in diseases])
+
+    chunks = list(iter_synthetic_chunks(prob_matrix, samples_per_disease, chunk_size, seed, noise_rate, dropout_rate))
+    values = np.vstack([values for values, _ in chunks])
+    disease_idx = np.concatenate([idx for _, idx in chunks])
+
+    synthetic_df = pd.DataFrame(values, columns=symptoms)
+    synthetic_df["Disease"] = np.asarray(diseases, dtype=object)[disease_idx]
+    return synthetic_df
+
+
+# Everything that decides the generated split
+def generator_config(samples_per_disease=samples_per_disease, noise_rate=noise_rate, dropout_rate=dropout_rate,
+                     seed=SEED, chunk_size=CHUNK_SIZE, dataset_path=DATASET_PATH):
+    return {
+        "version": GENERATOR_VERSION,
+        "dataset_sha256": file_sha256(dataset_path),
+        "samples_per_disease": samples_per_disease,
+        "noise_rate": noise_rate,
+        "dropout_rate": dropout_rate,
+        "seed": seed,
+        "chunk_size": chunk_size,
+        "min_symptom_count": MIN_SYMPTOM_COUNT,
+        "test_size": TEST_SIZE,
+    }
+
+
+def config_hash(config):
+    return hashlib.sha256(json.dumps(config, sort_keys=True).encode()).hexdigest()[:16]
+
+
+def build_training_split(config=None, dataset_path=DATASET_PATH):
+    if config is None:
+        config = generator_config(dataset_path=dataset_path)
+
+    data = load_symptom_csr(dataset_path)
+    disease_symptom_prob = compute_disease_symptom_prob(data)
+    symptoms = data["symptoms"]
+
+    synthetic_df = generate_synthetic_patients(
+        disease_symptom_prob, symptoms, config["samples_per_disease"], config["seed"],
+        config["chunk_size"], config["noise_rate"], config["dropout_rate"]
+    )
+
+    # Remove rare symptoms
+    symptom_counts = synthetic_df.drop("Disease", axis=1).sum()
+    common_symptoms = symptom_counts[symptom_counts > config["min_symptom_count"]].index.tolist()
+
+    synthetic_df = synthetic_df[common_symptoms + ["Disease"]]
+
+    # Encode labels
+    labels = LabelEncoder()
+    synthetic_df["label"] = labels.fit_transform(synthetic_df["Disease"])
+
+    x = synthetic_df.drop(["Disease", "label"], axis=1)
+    y = synthetic_df["label"]
+
+    x_train, x_test, y_train, y_test = train_test_split(
+        x, y, test_size=config["test_size"], random_state=42, stratify=y
+    )
+
+    return x_train, x_test, y_train, y_test, labels
+
+
+# build_training_split() through an on-disk cache keyed by the config hash.
+# Returns the split and whether it came from the cache; `refresh` regenerates it.
+def cached_training_split(config, cache_dir=TRAINING_CACHE_DIR, dataset_path=DATASET_PATH, refresh=False):
+    path = os.path.join(cache_dir, f"split_{config_hash(config)}.npz")
+
+    if os.path.exists(path) and not refresh:
+        with np.load(path, allow_pickle=False) as cached:
+            columns = cached["columns"].tolist()
+
+            labels = LabelEncoder()
+            labels.classes_ = cached["classes"].astype(object)
+
+            split = (
+                pd.DataFrame(cached["x_train"], columns=columns),
+                pd.DataFrame(cached["x_test"], columns=columns),
+                pd.Series(cached["y_train"], name="label"),
+                pd.Series(cached["y_test"], name="label"),
+                labels,
+            )
+        return split, True
+
+    x_train, x_test, y_train, y_test, labels = build_training_split(config, dataset_path)
+
+    os.makedirs(cache_dir, exist_ok=True)
+    tmp_path = path + ".tmp.npz"
+    np.savez(
+        tmp_path,
+        x_train=x_train.to_numpy(dtype=np.uint8),
+        x_test=x_test.to_numpy(dtype=np.uint8),
+        y_train=y_train.to_numpy(),
+        y_test=y_test.to_numpy(),
+        columns=np.array(x_train.columns.tolist()),
+        classes=np.array(labels.classes_.tolist()),
+    )
+    os.replace(tmp_path, path)
+
+    return (x_train, x_test, y_train, y_test, labels), False